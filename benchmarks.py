@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" Compares the performance of alternative query strategies in hvad.
+    Runs against a test database populated with translated objects.
+    Also measures the cost of building chained querysets, without running them.
+"""
+import django
+from django.conf import settings
+from runtests import CONFIGURATION, parse_database
+import argparse
+import os
+import sys
+import timeit
+
+#=============================================================================
+
+BENCHMARKS = []
+
+def benchmark(func):
+    BENCHMARKS.append(func)
+    return func
+
+#=============================================================================
+# Benchmarks - each one receives the fallback chain and returns a queryset
+
+def fallbacks_benchmark(strategy):
+    def func(languages):
+        from hvad.test_utils.project.app.models import Normal
+        return (Normal.objects.language(languages[0])
+                              .fallbacks(*languages[1:], strategy=strategy)
+                              .order_by('pk'))
+    func.__name__ = 'fallbacks_%s' % strategy
+    return benchmark(func)
+
+for strategy in ('join', 'window', 'subquery', 'python'):
+    fallbacks_benchmark(strategy)
+
+#=============================================================================
+# Chaining benchmarks - each one builds a queryset with CHAIN_LENGTH filters
+
+CHAIN_BENCHMARKS = []
+CHAIN_LENGTH = 8
+
+def chain_benchmark(func):
+    CHAIN_BENCHMARKS.append(func)
+    return func
+
+@chain_benchmark
+def chain_translated(values):
+    from django.db.models import Q
+    from hvad.test_utils.project.app.models import Normal
+    qs = Normal.objects.language('en')
+    for index in range(CHAIN_LENGTH):
+        qs = qs.filter(Q(pk__in=values) | Q(shared_field='shared%d' % index),
+                       translated_field__startswith='l')
+    return qs
+
+@chain_benchmark
+def chain_translation_aware(values):
+    from django.db.models import Q
+    from hvad.test_utils.project.app.models import Standard
+    from hvad.utils import get_translation_aware_manager
+    qs = get_translation_aware_manager(Standard).language('en')
+    for index in range(CHAIN_LENGTH):
+        qs = qs.filter(Q(normal__in=values) | Q(normal__translated_field='l%d' % index))
+    return qs
+
+@chain_benchmark
+def chain_untranslated(values):
+    from django.db.models import Q
+    from hvad.test_utils.project.app.models import Normal
+    qs = Normal.objects.untranslated()
+    for index in range(CHAIN_LENGTH):
+        qs = qs.filter(Q(pk__in=values) | Q(shared_field='shared%d' % index))
+    return qs
+
+#=============================================================================
+
+def populate(objects, languages):
+    ''' Create objects, the nth object being translated in all languages but
+        the (n % len(languages)) first ones, so fallbacks are needed.
+    '''
+    from hvad.test_utils.project.app.models import Normal
+    Translation = Normal._meta.translations_model
+    Normal.objects.untranslated().bulk_create(
+        Normal(shared_field='shared%d' % i) for i in range(objects)
+    )
+    pks = Normal.objects.untranslated().order_by('pk').values_list('pk', flat=True)
+    Translation.objects.bulk_create(
+        Translation(master_id=pk, language_code=code, translated_field='%s-%d' % (code, pk))
+        for index, pk in enumerate(pks)
+        for code in languages[index % len(languages):]
+    )
+
+def run(func, languages, repeat):
+    qs = func(languages)
+    count = len(qs._clone())
+    timings = timeit.repeat(lambda: list(qs._clone()), number=1, repeat=repeat)
+    return count, min(timings), sum(timings) / len(timings)
+
+def run_chain(func, values, repeat, number):
+    timings = timeit.repeat(lambda: func(values), number=number, repeat=repeat)
+    return min(timings) / number, sum(timings) / len(timings) / number
+
+def main(database=None, objects=2000, languages=10, repeat=5, chains=100, names=None):
+    if database is None:
+        database = os.environ.get('DATABASE_URL', 'sqlite://localhost/hvad.db')
+
+    config = CONFIGURATION.copy()
+    config['DEBUG'] = False
+    config['DATABASES'] = {'default': parse_database(database)}
+    settings.configure(**config)
+    django.setup()
+
+    from django.db import connection
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        codes = ['l%02d' % i for i in range(languages)]
+        populate(objects, codes)
+        print('%d objects, %d languages, best/mean of %d runs on %s' %
+              (objects, languages, repeat, connection.vendor))
+        for func in BENCHMARKS:
+            if names and func.__name__ not in names:
+                continue
+            count, best, mean = run(func, codes, repeat)
+            print('%-30s %8d rows %10.2fms %10.2fms' %
+                  (func.__name__, count, best * 1000, mean * 1000))
+
+        values = list(range(100))
+        print('%d chained filters, %d values in lists, best/mean of %d runs of %d chains' %
+              (CHAIN_LENGTH, len(values), repeat, chains))
+        for func in CHAIN_BENCHMARKS:
+            if names and func.__name__ not in names:
+                continue
+            best, mean = run_chain(func, values, repeat, chains)
+            print('%-30s %19.2fms %10.2fms' % (func.__name__, best * 1000, mean * 1000))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--database')
+    parser.add_argument('--objects', type=int, default=2000)
+    parser.add_argument('--languages', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--chains', type=int, default=100)
+    parser.add_argument('names', nargs='*')
+    args = parser.parse_args()
+
+    sys.exit(main(**vars(args)))
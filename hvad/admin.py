@@ -335,6 +335,8 @@ class TranslatableAdmin(ModelAdmin, TranslatableModelAdminMixin):
     def get_queryset(self, request):
         language = self._language(request)
         qs = self.model._default_manager.language(language).fallbacks(*hvad_settings.FALLBACK_LANGUAGES)
+        if 'all_translations' in self.get_list_display(request):
+            qs = qs.annotate_available_languages()
 
         # TODO: this should be handled by some parameter to the ChangeList.
         ordering = getattr(self, 'ordering', None) or ()
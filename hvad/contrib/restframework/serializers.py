@@ -82,19 +82,14 @@ class TranslationsMixin(object):
         # This means we allow translated fields to be absent if translations are set
 
         if isinstance(self, TranslatableModelMixin):
-            tmodel = self.Meta.model._meta.translations_model
+            opts = self.Meta.model._meta
 
             # Look for translated fields, and mark them read_only if translations is set
-            if self.Meta.model._meta.translations_accessor in data:
+            if opts.translations_accessor in data:
                 for name, field in self.fields.items():
                     source = field.source or field.field_name
-                    if source in veto_fields:
-                        continue # not a translated field
-                    try:
-                        tmodel._meta.get_field(source)
-                    except FieldDoesNotExist:
-                        continue # not a translated field
-                    field.read_only = True
+                    if source in opts.translated_field_names or source in opts.translated_attnames:
+                        field.read_only = True
 
         return super(TranslationsMixin, self).to_internal_value(data)
 
@@ -181,18 +176,14 @@ class TranslatableModelMixin(object):
 
     def get_uniqueness_extra_kwargs(self, field_names, declared_fields, *args):
         # Default implementation chokes on translated fields, filter them out
+        opts = self.Meta.model._meta
         shared_fields = []
         for field_name in field_names:
             field = declared_fields.get(field_name)
             if field is not None:
                 field_name = field.source or field_name
-            if field_name not in veto_fields:
-                try:
-                    self.Meta.model._meta.translations_model._meta.get_field(field_name)
-                except FieldDoesNotExist:
-                    pass
-                else:
-                    continue
+            if field_name in opts.translated_field_names or field_name in opts.translated_attnames:
+                continue
             shared_fields.append(field_name)
 
         return super(TranslatableModelMixin, self).get_uniqueness_extra_kwargs(shared_fields, declared_fields, *args)
@@ -206,13 +197,9 @@ class TranslatableModelMixin(object):
             return klass, kwargs
 
         # Try to find a translated field matching the description
-        field = None
-        if field_name not in veto_fields:
-            try:
-                field = model_class._meta.translations_model._meta.get_field(field_name)
-            except FieldDoesNotExist:
-                pass
-        if field is not None:
+        opts = model_class._meta
+        if field_name in opts.translated_field_names or field_name in opts.translated_attnames:
+            field = opts.translations_model._meta.get_field(field_name)
             return self.build_standard_field(field_name, field)
 
         # Nothing unusual, let rest_framework do its stuff
@@ -1,7 +1,8 @@
 from django.apps import registry
 from django.utils.translation import get_language
 from hvad.settings import hvad_settings
-from hvad.utils import get_translation, set_cached_translation
+from hvad.utils import (get_best_translation, get_cached_translations, get_translation,
+                        load_sibling_translations, set_cached_translation)
 
 __all__ = ()
 
@@ -20,18 +21,32 @@ class TranslatedAttribute(object):
                                         {})
         super(TranslatedAttribute, self).__init__()
 
-    def load_translation(self, instance):
+    def load_translation(self, instance, fallbacks=False):
         if not hvad_settings.AUTOLOAD_TRANSLATIONS:
             raise AttributeError('Field %r is a translatable field, but no translation is loaded '
                                  'and auto-loading is disabled because '
                                  'settings.HVAD[\'AUTOLOAD_TRANSLATIONS\'] is False' % self.name)
-        try:
-            translation = get_translation(instance)
-        except instance._meta.translations_model.DoesNotExist:
+        language_code = get_language()
+        if fallbacks:
+            languages = (language_code,) + hvad_settings.FALLBACK_LANGUAGES
+            if (load_sibling_translations(instance, language_code) and
+                language_code not in get_cached_translations(instance)):
+                languages = tuple(code for code in languages if code != language_code)
+            translation = get_best_translation(instance, languages)
+        else:
+            try:
+                if load_sibling_translations(instance, language_code):
+                    translation = get_cached_translations(instance)[language_code]
+                else:
+                    translation = get_translation(instance, language_code)
+            except (KeyError, instance._meta.translations_model.DoesNotExist):
+                translation = None
+        if translation is None:
             raise self._NoTranslationError('Accessing a translated field requires that '
                                            'the instance has a translation loaded, or a '
-                                           'valid translation in current language (%s) '
-                                           'loadable from the database' % get_language())
+                                           'valid translation in current language (%s)%s '
+                                           'loadable from the database'
+                                           % (language_code, ' or fallbacks' if fallbacks else ''))
         set_cached_translation(instance, translation)
         return translation
 
@@ -43,7 +58,7 @@ class TranslatedAttribute(object):
         try:
             translation = getattr(instance, self.tcache_name)
         except AttributeError:
-            translation = self.load_translation(instance)
+            translation = self.load_translation(instance, fallbacks=True)
         return getattr(translation, self.name)
     
     def __set__(self, instance, value):
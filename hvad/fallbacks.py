@@ -0,0 +1,409 @@
+""" Strategies for resolving fallbacks in TranslationQueryset.
+    A strategy picks one translation per object out of a list of languages.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, models
+from django.db.models import Case, Func, IntegerField, Value, When
+from django.db.models.expressions import Col
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import Exact
+from django.db.models.sql.datastructures import Join, LOUTER
+from django.db.models.sql.where import AND
+from hvad.query import add_alias_constraints, window_functions_supported
+from hvad.settings import hvad_settings
+from hvad.utils import set_prefetched_translations
+
+__all__ = ('FallbackStrategy', 'JoinStrategy', 'WindowStrategy',
+           'SubqueryStrategy', 'PythonStrategy', 'LanguagesStrategy', 'STRATEGIES',
+           'get_strategy', 'add_field_fallbacks')
+
+#===============================================================================
+# SQL constraints
+#===============================================================================
+
+class RawConstraint(object):
+    def __init__(self, sql, aliases):
+        self.sql = sql
+        self.aliases = aliases
+
+    def as_sql(self, compiler, connection):
+        aliases = tuple(compiler.quote_name_unless_alias(alias) for alias in self.aliases)
+        return (self.sql % aliases, [])
+
+class BetterTranslationsField(object):
+    def __init__(self, translation_fallbacks, master):
+        # Filter out duplicates, while preserving order
+        self._fallbacks = []
+        self._master = master
+        seen = set()
+        for lang in translation_fallbacks:
+            if lang not in seen:
+                seen.add(lang)
+                self._fallbacks.append(lang)
+
+    def get_extra_restriction(self, where_class, alias, related_alias):
+        langcase = ('(CASE %s.language_code ' +
+                    ' '.join('WHEN \'%s\' THEN %d' % (lang, i)
+                             for i, lang in enumerate(self._fallbacks)) +
+                    ' ELSE %d END)' % len(self._fallbacks))
+        return RawConstraint(
+            sql=' '.join((langcase, '<', langcase, 'OR (',
+                          langcase, '=', langcase, 'AND %s.id < %s.id)')),
+            aliases=(alias, related_alias,
+                     alias, related_alias,
+                     alias, related_alias)
+        )
+
+    def get_joining_columns(self):
+        return ((self._master, self._master), )
+
+class LanguageTranslationsField(object):
+    """ Fake field joining the translation of the same master in given language """
+    def __init__(self, model, language):
+        self.model = model
+        self.language = language
+
+    def get_extra_restriction(self, where_class, alias, related_alias):
+        return Exact(Col(alias, self.model._meta.get_field('language_code')), self.language)
+
+    def get_joining_columns(self):
+        column = self.model._meta.get_field('master').column
+        return ((column, column), )
+
+class NullIfEmpty(Func):
+    function = 'NULLIF'
+    template = "%(function)s(%(expressions)s, '')"
+
+class TranslationsConstraint(object):
+    """ Base for where clauses keeping a single translation of each master,
+        for translations under given alias.
+    """
+    contains_aggregate = False
+
+    def __init__(self, model, alias, translation_fallbacks):
+        self.model = model
+        self.alias = alias
+        # Filter out duplicates, while preserving order
+        self._fallbacks = []
+        for lang in translation_fallbacks:
+            if lang not in self._fallbacks:
+                self._fallbacks.append(lang)
+
+    def relabeled_clone(self, change_map):
+        return self.__class__(self.model, change_map.get(self.alias, self.alias),
+                              self._fallbacks)
+
+    def get_columns(self, compiler, connection):
+        qn = connection.ops.quote_name
+        opts = self.model._meta
+        return {
+            'alias': compiler.quote_name_unless_alias(self.alias),
+            'table': qn(opts.db_table),
+            'pk': qn(opts.pk.column),
+            'master': qn(opts.get_field('master').column),
+            'language': qn(opts.get_field('language_code').column),
+        }
+
+    def get_langcase(self, column):
+        """ Ranks languages in requested order, others last. Params are the languages """
+        return ('(CASE %s ' % column +
+                ' '.join('WHEN %%s THEN %d' % i for i in range(len(self._fallbacks))) +
+                ' ELSE %d END)' % len(self._fallbacks))
+
+class RankedTranslationsConstraint(TranslationsConstraint):
+    """ Keeps only the best ranked translation of each master, ranking
+        translations in requested languages with ROW_NUMBER()
+    """
+    def as_sql(self, compiler, connection):
+        columns = self.get_columns(compiler, connection)
+        columns.update({
+            'langcase': self.get_langcase(columns['language']),
+            'languages': ', '.join(['%s'] * len(self._fallbacks)),
+        })
+        sql = ('%(alias)s.%(pk)s IN (SELECT %(pk)s FROM ('
+               'SELECT %(pk)s, ROW_NUMBER() OVER ('
+               'PARTITION BY %(master)s ORDER BY %(langcase)s, %(pk)s) AS hvad_rank '
+               'FROM %(table)s WHERE %(language)s IN (%(languages)s)'
+               ') hvad_ranked WHERE hvad_rank = 1)')
+        return sql % columns, self._fallbacks * 2
+
+class BestTranslationConstraint(TranslationsConstraint):
+    """ Keeps only the translation joined under alias that has no better ranked
+        sibling, using the same ranking as BetterTranslationsField. Unlike the
+        join, it can be applied to a translations table that is already joined
+        through select_related. It is always true if the join matched nothing.
+    """
+    def as_sql(self, compiler, connection):
+        columns = self.get_columns(compiler, connection)
+        columns.update({
+            'better_langcase': self.get_langcase('hvad_better.%s' % columns['language']),
+            'langcase': self.get_langcase('%(alias)s.%(language)s' % columns),
+        })
+        sql = ('NOT EXISTS (SELECT 1 FROM %(table)s hvad_better '
+               'WHERE hvad_better.%(master)s = %(alias)s.%(master)s AND '
+               '(%(better_langcase)s < %(langcase)s OR ('
+               '%(better_langcase)s = %(langcase)s AND '
+               'hvad_better.%(pk)s < %(alias)s.%(pk)s)))')
+        return sql % columns, self._fallbacks * 4
+
+class FirstTranslationConstraint(TranslationsConstraint):
+    """ Keeps only the translation that comes first when sorting translations
+        of the same master by rank, using a correlated subquery.
+    """
+    def as_sql(self, compiler, connection):
+        columns = self.get_columns(compiler, connection)
+        columns['langcase'] = self.get_langcase('hvad_first.%s' % columns['language'])
+        sql = ('%(alias)s.%(pk)s = (SELECT hvad_first.%(pk)s FROM %(table)s hvad_first '
+               'WHERE hvad_first.%(master)s = %(alias)s.%(master)s '
+               'ORDER BY %(langcase)s, hvad_first.%(pk)s LIMIT 1)')
+        return sql % columns, list(self._fallbacks)
+
+#===============================================================================
+# Strategies
+#===============================================================================
+
+class FallbackStrategy(object):
+    """ Base class for fallback strategies. Strategies are stateless, a single
+        instance is used for all querysets.
+    """
+    #: Name used to select the strategy
+    name = None
+    #: Whether objects with no translation in any requested language are excluded
+    restricts_languages = False
+    #: Whether the strategy picks translations after loading them from the database
+    resolves_in_python = False
+    #: Whether the strategy returns the same results as the join strategy, for every
+    #: query the join strategy supports. Only such strategies can be vendor defaults.
+    matches_join = False
+
+    def supports(self, connection):
+        """ Tells whether the strategy can run on the given connection """
+        return True
+
+    def apply(self, queryset, languages):
+        """ Sets up the query of given TranslationQueryset so it loads the best
+            translation of each object out of given languages.
+            Returns a callable to filter loaded translations, or None.
+        """
+        raise NotImplementedError
+
+class JoinStrategy(FallbackStrategy):
+    """ Joins translations table to itself, keeping translations that have no
+        better ranked sibling.
+    """
+    name = 'join'
+    matches_join = True
+
+    def apply(self, queryset, languages):
+        query = queryset.query
+        masteratt = queryset.model._meta.get_field('master').attname
+        alias = query.join(Join(
+            queryset.model._meta.db_table,
+            query.get_initial_alias(),
+            None,
+            LOUTER,
+            BetterTranslationsField(languages, master=masteratt),
+            True
+        ))
+        add_alias_constraints(queryset, (queryset.model, alias), id__isnull=True)
+        query.add_filter(('%s__isnull' % masteratt, False))
+
+class WindowStrategy(FallbackStrategy):
+    """ Ranks translations in requested languages with ROW_NUMBER() """
+    name = 'window'
+    restricts_languages = True
+
+    def supports(self, connection):
+        return window_functions_supported(connection)
+
+    def apply(self, queryset, languages):
+        queryset.query.where.add(RankedTranslationsConstraint(
+            queryset.model, queryset.query.get_initial_alias(), languages
+        ), AND)
+
+class SubqueryStrategy(FallbackStrategy):
+    """ Picks the first translation by rank with a correlated LIMIT 1 subquery """
+    name = 'subquery'
+    matches_join = True
+
+    def supports(self, connection):
+        return connection.vendor != 'oracle'
+
+    def apply(self, queryset, languages):
+        queryset.query.where.add(FirstTranslationConstraint(
+            queryset.model, queryset.query.get_initial_alias(), languages
+        ), AND)
+
+class PythonStrategy(FallbackStrategy):
+    """ Loads all translations in requested languages, sorted by object then
+        rank, and keeps the first one of each object while streaming them.
+        Filters on translated fields apply to candidate translations.
+    """
+    name = 'python'
+    restricts_languages = True
+    resolves_in_python = True
+
+    def apply(self, queryset, languages):
+        query = queryset.query
+        if query.extra_order_by or not all(self._is_shared_ordering(item)
+                                           for item in query.order_by):
+            raise NotImplementedError('The python fallbacks strategy only supports '
+                                      'ordering on shared fields')
+
+        query.add_filter(('language_code__in', languages))
+        if query.low_mark or query.high_mark is not None:
+            # Limits apply to objects, not to candidate translations, so pick
+            # objects in SQL first and only load candidates for those.
+            query.add_filter(('master__in', self._sliced_masters(queryset)))
+            query.clear_limits()
+
+        rank = Case(*[When(language_code=lang, then=Value(index))
+                      for index, lang in enumerate(languages)],
+                    output_field=IntegerField())
+        ordering = tuple(query.order_by) + ('master__pk', rank.asc())
+        query.clear_ordering(force_empty=True)
+        query.add_ordering(*ordering)
+        return self._first_translations
+
+    @classmethod
+    def _sliced_masters(cls, queryset):
+        """ Returns primary keys of shared objects within the slice of the
+            queryset, those with candidate translations only. It is a subquery
+            if the database supports sliced subqueries, a list otherwise.
+        """
+        query = queryset.query.clone()
+        query.clear_limits()
+        candidates = models.QuerySet(queryset.model, query=query, using=queryset.db)
+        ordering = [name for item in queryset.query.order_by
+                    for name in cls._shared_ordering(item, queryset.shared_model._meta)]
+        masters = (models.QuerySet(queryset.shared_model, using=queryset.db)
+                         .filter(pk__in=candidates.order_by().values('master_id'))
+                         .order_by(*(ordering + ['pk'])))
+        masters = masters[queryset.query.low_mark:queryset.query.high_mark].values('pk')
+        if connections[queryset.db].features.allow_sliced_subqueries:
+            return masters
+        return [item['pk'] for item in masters]
+
+    @staticmethod
+    def _shared_ordering(item, shared_opts):
+        """ Translates an ordering item of the translations model into ordering
+            items of the shared model, preserving its direction.
+        """
+        descending = item.startswith('-')
+        name = item.lstrip('-')
+        if name == 'master':
+            names = shared_opts.ordering or ['pk']
+        elif name == 'master_id':
+            names = ['pk']
+        else:
+            names = [name[len('master__'):]]
+        if not descending:
+            return list(names)
+        return [name[1:] if name.startswith('-') else '-' + name for name in names]
+
+    @staticmethod
+    def _is_shared_ordering(item):
+        if not hasattr(item, 'lstrip'):
+            return False
+        item = item.lstrip('-')
+        return item in ('master', 'master_id') or item.startswith('master__')
+
+    @staticmethod
+    def _first_translations(objects):
+        master = None
+        for obj in objects:
+            if obj.master_id != master:
+                master = obj.master_id
+                yield obj
+
+class LanguagesStrategy(PythonStrategy):
+    """ Loads translations like PythonStrategy, but keeps all loaded translations
+        of each object in its translations prefetch cache, along with the first one.
+        Used by TranslationQueryset.languages(), it does not handle fallbacks.
+    """
+    name = 'languages'
+
+    @staticmethod
+    def _first_translations(objects):
+        group = []
+        for obj in objects:
+            if group and obj.master_id != group[0].master_id:
+                yield LanguagesStrategy._attach(group)
+                group = []
+            group.append(obj)
+        if group:
+            yield LanguagesStrategy._attach(group)
+
+    @staticmethod
+    def _attach(group):
+        first = group[0]
+        for obj in group[1:]:
+            obj.master = first.master
+        set_prefetched_translations(first.master, group)
+        return first
+
+STRATEGIES = dict((strategy.name, strategy) for strategy in (
+    JoinStrategy(), WindowStrategy(), SubqueryStrategy(), PythonStrategy(),
+))
+
+def get_strategy(strategy, connection):
+    """ Returns the strategy to use on connection for given strategy argument.
+        - strategy: a strategy name, a FallbackStrategy instance, or None for
+          the default strategy of connection's vendor.
+    """
+    if strategy is None:
+        strategy = get_strategy(hvad_settings.FALLBACK_STRATEGIES.get(connection.vendor, 'join'),
+                                connection)
+        if not strategy.matches_join:
+            raise ImproperlyConfigured('Fallbacks strategy %r returns different results than '
+                                       'the join strategy, it cannot be used as a default in '
+                                       'HVAD["FALLBACK_STRATEGIES"]' % strategy.name)
+        return strategy
+    if isinstance(strategy, FallbackStrategy):
+        return strategy
+    try:
+        return STRATEGIES[strategy]
+    except KeyError:
+        raise ValueError('Unknown fallbacks strategy %r' % strategy)
+
+#===============================================================================
+# Per-field fallbacks
+#===============================================================================
+
+def add_field_fallbacks(queryset, languages):
+    """ Joins translations in each of given languages to the query of given
+        TranslationQueryset, and annotates it with the first non-empty value
+        of each translated field, starting with the loaded translation.
+        - Relations are left out, so related objects remain consistent.
+        - Returns a callable that moves merged values onto loaded translations.
+    """
+    query = queryset.query
+    model = queryset.model
+    base = query.get_initial_alias()
+    aliases = [base]
+    for language in languages:
+        if language not in languages[:languages.index(language)]:
+            aliases.append(query.join(Join(
+                model._meta.db_table, base, None, LOUTER,
+                LanguageTranslationsField(model, language), True
+            )))
+
+    fields = []
+    for field in model._meta.concrete_fields:
+        if field.primary_key or field.is_relation or field.name == 'language_code':
+            continue
+        values = [Col(alias, field) for alias in aliases]
+        if isinstance(field, (models.CharField, models.TextField)):
+            # Empty strings are missing values, keep loaded one if all are empty
+            values = [NullIfEmpty(value) for value in values] + [Col(base, field)]
+        name = 'hvad_fallback_%s' % field.attname
+        query.add_annotation(Coalesce(*values, output_field=field), name)
+        fields.append((name, field.attname))
+
+    def merge(objects):
+        for obj in objects:
+            for name, attname in fields:
+                setattr(obj, attname, getattr(obj, name))
+                delattr(obj, name)
+            yield obj
+    return merge
@@ -0,0 +1,91 @@
+""" Times fallback strategies against actual translatable models,
+    and recommends the fastest one for the database, out of those
+    returning the same results as the join strategy.
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.translation import get_language
+from hvad.fallbacks import STRATEGIES
+from hvad.settings import hvad_settings
+import timeit
+
+
+class Command(BaseCommand):
+    help = ('Times each fallbacks strategy on translatable models and recommends '
+            'the fastest one that can be used as a default.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', metavar='app_label.ModelName',
+                            help='Models to run benchmarks on. Defaults to all '
+                                 'translatable models.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database to run benchmarks on.')
+        parser.add_argument('--languages',
+                            help='Comma-separated list of languages, by priority. Defaults '
+                                 'to current language followed by FALLBACK_LANGUAGES.')
+        parser.add_argument('--limit', type=int, default=1000,
+                            help='Number of objects to load from each model, 0 for all.')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Number of runs of each benchmark, the best one is kept.')
+
+    def get_models(self, labels):
+        if not labels:
+            return [model for model in apps.get_models()
+                    if hasattr(model._meta, 'translations_model') and not model._meta.proxy]
+        models = []
+        for label in labels:
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError) as exc:
+                raise CommandError(str(exc))
+            if not hasattr(model._meta, 'translations_model'):
+                raise CommandError('%s is not a translatable model' % label)
+            models.append(model)
+        return models
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if options['languages']:
+            languages = options['languages'].split(',')
+        else:
+            languages = (get_language(),) + hvad_settings.FALLBACK_LANGUAGES
+
+        strategies = [strategy for name, strategy in sorted(STRATEGIES.items())
+                      if strategy.supports(connection)]
+        totals = dict((strategy.name, 0) for strategy in strategies)
+        for model in self.get_models(options['models']):
+            opts = model._meta
+            self.stdout.write('%s.%s' % (opts.app_label, opts.object_name))
+            for strategy in strategies:
+                qs = (model._default_manager.language(languages[0])
+                                            .fallbacks(*languages[1:], strategy=strategy.name)
+                                            .using(options['database']))
+                if options['limit']:
+                    qs = qs[:options['limit']]
+                try:
+                    timing = min(timeit.repeat(lambda: list(qs._clone()),
+                                               number=1, repeat=options['repeat']))
+                except NotImplementedError as exc:
+                    self.stdout.write('    %-10s skipped: %s' % (strategy.name, exc))
+                    totals.pop(strategy.name, None)
+                    continue
+                self.stdout.write('    %-10s %10.2fms%s' % (
+                    strategy.name, timing * 1000,
+                    '' if strategy.matches_join else ' (*)'))
+                if strategy.name in totals:
+                    totals[strategy.name] += timing
+
+        if any(not strategy.matches_join for strategy in strategies):
+            self.stdout.write('(*) Returns different results than the join strategy, for instance '
+                              'leaving out objects not translated in requested languages, or '
+                              'does not support all queries. It is not recommended, and '
+                              'can only be selected by passing strategy to fallbacks().')
+        totals = dict((name, total) for name, total in totals.items()
+                      if STRATEGIES[name].matches_join)
+        if not totals:
+            raise CommandError('No strategy could run on all models')
+        best = min(sorted(totals), key=totals.get)
+        self.stdout.write('Recommended strategy for %s: %s' % (connection.vendor, best))
+        self.stdout.write('    HVAD = {"FALLBACK_STRATEGIES": {"%s": "%s"}}' %
+                          (connection.vendor, best))
@@ -5,48 +5,61 @@ if django.VERSION >= (1, 9):
     from django.db.models.query import QuerySet
 else:
     from django.db.models.query import QuerySet, ValuesQuerySet
-from django.db.models.sql.datastructures import Join, LOUTER
-from django.db.models import F, Q
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.sql.constants import GET_ITERATOR_CHUNK_SIZE
+from django.db.models.sql.where import AND
+from django.db.models import Case, Count, F, Prefetch, Q, Value, When, signals
+if django.VERSION >= (1, 10):
+    from django.db.models.functions import Cast
 from django.utils.functional import cached_property
 from django.utils.translation import get_language
 from hvad.compat import string_types
-from hvad.query import (query_terms, q_children, expression_nodes,
-                        add_alias_constraints)
+from hvad.fallbacks import (BestTranslationConstraint, STRATEGIES, FallbackStrategy,
+                            LanguagesStrategy, add_field_fallbacks, get_strategy)
+from hvad.query import (query_terms, map_q, expression_nodes, where_columns,
+                        map_expression, map_where_columns, get_lookup_cache,
+                        AvailableLanguages, CorrelatedColumn,
+                        can_fast_delete, raw_delete, upsert, upsert_supported)
 from hvad.settings import hvad_settings
-from hvad.utils import combine
-from copy import deepcopy
+from hvad.utils import (combine, get_cached_translation, get_cached_translations,
+                        get_translation, set_cached_languages, set_cached_translation,
+                        TranslationSiblings)
+from itertools import chain, islice
 import sys
 
-__all__ = ('TranslationQueryset', 'TranslationManager')
+__all__ = ('TranslationQueryset', 'UntranslatedQueryset', 'TranslationManager',
+           'TranslatedPrefetch')
+
+LANGUAGES_STRATEGY = LanguagesStrategy()
 
 #===============================================================================
 
 class FieldTranslator(object):
     """
     Translates *shared* field names from '<shared_field>' to
-    'master__<shared_field>' and caches those names.
+    'master__<shared_field>' and caches those names in the lookup cache
+    of the shared model, so all querysets share them.
     """
     def __init__(self, manager):
         self._manager = manager
+        self._cache = get_lookup_cache(manager.shared_model)
+        super(FieldTranslator, self).__init__()
+
+    def __call__(self, key):
+        return self._cache.get('shared', key, self._build)
+
+    @staticmethod
+    def _get_shared_fields(model, path):
         fields = set()
-        for field in manager.shared_model._meta.get_fields():
+        for field in model._meta.get_fields():
             fields.add(field.name)
             if hasattr(field, 'attname'):
                 fields.add(field.attname)
         fields.add('pk')
-        self._shared_fields = tuple(fields)
-        self._cache = dict()
-        super(FieldTranslator, self).__init__()
+        return tuple(fields)
 
-    def __call__(self, key):
-        try:
-            ret = self._cache[key]
-        except KeyError:
-            ret = self._build(key)
-            self._cache[key] = ret
-        return ret
-
-    def _build(self, key):
+    @classmethod
+    def _build(cls, model, key):
         """
         Checks if the selected field is a shared field
         and in that case, prefixes it with master___
@@ -59,11 +72,89 @@ class FieldTranslator(object):
             prefix, key = "-", key[1:]
         else:
             prefix = ""
-        if key.startswith(self._shared_fields):
+        shared_fields = get_lookup_cache(model).get('shared_fields', None, cls._get_shared_fields)
+        if key.startswith(shared_fields):
             return '%smaster__%s' % (prefix, key)
         else:
             return '%s%s' % (prefix, key)
 
+
+def resolve_select_related(model, query_key):
+    """ Resolves a select_related() path on a translatable model. Returns a
+        (related_queries, language_filters, force_unique_fields) tuple, for
+        _add_select_related to apply to the query of translations.
+    """
+    newbits = []
+    related_queries = []
+    language_filters = []
+    force_unique_fields = []
+    for term in query_terms(model, query_key):
+
+        # Translate term
+        if term.depth == 0 and not term.translated:
+            # on initial depth we must key to shared model
+            newbits.append('master__%s' % term.term)
+        elif term.depth > 0 and term.translated:
+            # on deeper levels we must key to translations model
+            # this will work because translations will be seen as _unique
+            # at query time
+            newbits.append('%s__%s' % (term.model._meta.translations_accessor, term.term))
+        else:
+            newbits.append(term.term)
+
+        # Some helpful messages for common mistakes
+        if term.many:
+            raise FieldError('Cannot select_related: %s can be multiple objects. '
+                             'Use prefetch_related instead.' % query_key)
+        if term.target is None:
+            raise FieldError('Cannot select_related: %s is a regular field' % query_key)
+        if hasattr(term.field.rel, 'through'):
+            raise FieldError('Cannot select_related: %s can be multiple objects. '
+                             'Use prefetch_related instead.' % query_key)
+
+        # If target is a translated model, select its translations
+        target_translations = getattr(term.target._meta, 'translations_accessor', None)
+        if target_translations is not None:
+            # Add the model
+            target_query = '__'.join(newbits)
+            related_queries.append('%s__%s' % (target_query, target_translations))
+
+            # Add a language filter for the translation
+            language_filters.append(('%s__%s__language_code' % (
+                target_query,
+                target_translations,
+            ), term.target._meta.translations_model))
+
+            # Remember to mark the field unique so JOIN is generated
+            # and row decoder gets cached items
+            if django.VERSION >= (1, 9):
+                target_transfield = getattr(term.target, target_translations).field
+            else:
+                target_transfield = getattr(term.target, target_translations).related.field
+            force_unique_fields.append(target_transfield)
+
+    related_queries.append('__'.join(newbits))
+    return tuple(related_queries), tuple(language_filters), tuple(force_unique_fields)
+
+
+def resolve_translation_aware(model, key):
+    """ Resolves a lookup path for TranslationAwareQueryset. Returns the path
+        through translations accessors, and the language_code lookups of
+        translations joined on the way.
+    """
+    newkey = []
+    language_joins = []
+    for term in query_terms(model, key):
+        if term.translated:
+            newkey.append('%s__%s' % (term.model._meta.translations_accessor, term.term))
+        else:
+            newkey.append(term.term)
+        if term.target is not None:
+            taccessor = getattr(term.target._meta, 'translations_accessor', None)
+            if taccessor is not None:
+                language_joins.append('__'.join(newkey + [taccessor, 'language_code']))
+    return '__'.join(newkey), tuple(language_joins)
+
 #===============================================================================
 
 if django.VERSION >= (1, 9):
@@ -72,20 +163,28 @@ if django.VERSION >= (1, 9):
 
     class TranslatableModelIterable(ModelIterable):
         def __iter__(self):
-            qs = self.queryset._clone()._add_language_filter()
+            qs = self.queryset._clone()
+            shared_qs = qs._get_prefetch_queryset()
+            if shared_qs is not None:
+                for obj in qs._iterate_prefetched(shared_qs):
+                    yield obj
+                return
+
+            qs = qs._add_language_filter(iterating=True)
             qs._iterable_class = ModelIterable
             qs._known_related_objects = {}
+            objects = qs.iterator()
+            related = None
             if qs._forced_unique_fields:
-                with ForcedUniqueFields(qs._forced_unique_fields):
-                    objects = list(qs.iterator())
-
+                objects = iterate_forcing_unique(qs._forced_unique_fields, objects)
                 if type(qs.query.select_related) == dict:
-                    for obj in objects:
-                        qs._use_related_translations(obj, qs.query.select_related)
-            else:
-                objects = qs.iterator()
+                    related = qs.query.select_related
+            if qs._fallbacks_resolver is not None:
+                objects = qs._fallbacks_resolver(objects)
 
             for obj in objects:
+                if related is not None:
+                    qs._use_related_translations(obj, related)
                 for name in qs._hvad_switch_fields:
                     try:
                         setattr(obj.master, name, getattr(obj, name))
@@ -139,6 +238,18 @@ else:
 
 #===============================================================================
 
+def link_siblings(objects):
+    ''' Attach instances to a shared TranslationSiblings, so autoloading
+        a translation on one of them loads it for all of them.
+    '''
+    if not hvad_settings.AUTOLOAD_TRANSLATIONS:
+        return
+    siblings = TranslationSiblings()
+    for obj in objects:
+        siblings.add(obj)
+
+#===============================================================================
+
 class ForcedUniqueFields(object):
     """ Context manager that forces a set of fields to be unique while active """
     def __init__(self, fields):
@@ -152,46 +263,20 @@ class ForcedUniqueFields(object):
         for field in self.fields:
             field._unique = False
 
-#===============================================================================
-# Field for language joins
-#===============================================================================
-
-class RawConstraint(object):
-    def __init__(self, sql, aliases):
-        self.sql = sql
-        self.aliases = aliases
-
-    def as_sql(self, compiler, connection):
-        aliases = tuple(compiler.quote_name_unless_alias(alias) for alias in self.aliases)
-        return (self.sql % aliases, [])
-
-class BetterTranslationsField(object):
-    def __init__(self, translation_fallbacks, master):
-        # Filter out duplicates, while preserving order
-        self._fallbacks = []
-        self._master = master
-        seen = set()
-        for lang in translation_fallbacks:
-            if lang not in seen:
-                seen.add(lang)
-                self._fallbacks.append(lang)
-
-    def get_extra_restriction(self, where_class, alias, related_alias):
-        langcase = ('(CASE %s.language_code ' +
-                    ' '.join('WHEN \'%s\' THEN %d' % (lang, i)
-                             for i, lang in enumerate(self._fallbacks)) +
-                    ' ELSE %d END)' % len(self._fallbacks))
-        return RawConstraint(
-            sql=' '.join((langcase, '<', langcase, 'OR ('
-                          '%s.language_code = %s.language_code AND '
-                          '%s.id < %s.id)')),
-            aliases=(alias, related_alias,
-                     alias, related_alias,
-                     alias, related_alias)
-        )
-
-    def get_joining_columns(self):
-        return ((self._master, self._master), )
+def iterate_forcing_unique(fields, objects):
+    """ Iterates objects, forcing fields to be unique until the first one is
+        fetched. By then, Django has compiled and run the query, and set up row
+        decoding, so the rest is streamed with fields restored.
+    """
+    objects = iter(objects)
+    with ForcedUniqueFields(fields):
+        try:
+            first = next(objects)
+        except StopIteration:
+            return
+    yield first
+    for obj in objects:
+        yield obj
 
 #===============================================================================
 # TranslationQueryset
@@ -226,12 +311,15 @@ class TranslationQueryset(QuerySet):
             elif not hasattr(model._meta, 'shared_model'):
                 raise TypeError('TranslationQueryset only works on translatable models')
 
-        self._local_field_names = None
         self._field_translator = None
         self._language_code = None
         self._language_fallbacks = None
-        self._raw_select_related = []
-        self._forced_unique_fields = []  # Used for select_related
+        self._fallbacks_strategy = None
+        self._fallbacks_per_field = False
+        self._fallbacks_resolver = None # Used for python fallbacks strategies
+        self._loading_strategy = None
+        self._raw_select_related = ()
+        self._forced_unique_fields = ()  # Used for select_related
         self._language_filter_tag = False
         self._hvad_switch_fields = ()
         super(TranslationQueryset, self).__init__(model, *args, **kwargs)
@@ -244,17 +332,21 @@ class TranslationQueryset(QuerySet):
 
     def _clone(self, klass=None, setup=False, **kwargs):
         """ Creates a clone of this queryset - Django equivalent of copy()
-        This method keeps all defining attributes and drops data caches
+        This method keeps all defining attributes and drops data caches.
+        Attributes are immutable, so the clone shares them with this queryset.
         """
         kwargs.update({
             'shared_model': self.shared_model,
-            '_local_field_names': self._local_field_names,
             '_field_translator': self._field_translator,
             '_language_code': self._language_code,
             '_language_fallbacks': self._language_fallbacks,
+            '_fallbacks_strategy': self._fallbacks_strategy,
+            '_fallbacks_per_field': self._fallbacks_per_field,
+            '_fallbacks_resolver': self._fallbacks_resolver,
+            '_loading_strategy': self._loading_strategy,
             '_raw_select_related': self._raw_select_related,
-            '_forced_unique_fields': list(self._forced_unique_fields),
-            '_language_filter_tag': getattr(self, '_language_filter_tag', False),
+            '_forced_unique_fields': self._forced_unique_fields,
+            '_language_filter_tag': self._language_filter_tag,
             '_hvad_switch_fields': self._hvad_switch_fields,
         })
         if django.VERSION < (1, 9):
@@ -272,22 +364,12 @@ class TranslationQueryset(QuerySet):
 
     @property
     def shared_local_field_names(self):
-        if self._local_field_names is None:
-            fields = set()
-            for field in self.shared_model._meta.get_fields():
-                fields.add(field.name)
-                if hasattr(field, 'attname'):
-                    fields.add(field.attname)
-            self._local_field_names = tuple(fields)
-        return self._local_field_names
+        return self.shared_model._meta.shared_field_names
 
     def _translate_args_kwargs(self, *args, **kwargs):
         # Translate args (Q objects) from '<shared_field>' to
         # 'master__<shared_field>' where necessary.
-        newargs = deepcopy(args)
-        for q in newargs:
-            for child, children, index in q_children(q):
-                children[index] = (self.field_translator(child[0]), child[1])
+        newargs = tuple(map_q(q, self.field_translator) for q in args)
         # Translated kwargs from '<shared_field>' to 'master__<shared_field>'
         # where necessary.
         newkwargs = dict((self.field_translator(key), value)
@@ -304,6 +386,44 @@ class TranslationQueryset(QuerySet):
                 node.lookup = self.field_translator(node.lookup)
         return expr
 
+    def _correlate_expression(self, expr, shared):
+        """ Replaces F() objects in expr that reference the table not being
+            updated with correlated subqueries, so update() can copy values
+            between shared and translated fields.
+            - shared: whether expr is a value for the shared table.
+        """
+        opts = self.shared_model._meta
+        translated_names = (opts.translated_field_names | opts.translated_attnames |
+                            opts.veto_field_names)
+        master = self.model._meta.get_field('master')
+
+        def correlate(node):
+            if not isinstance(node, F) or LOOKUP_SEP in node.name or node.name == 'pk':
+                return node
+            if shared:
+                if node.name in self.shared_local_field_names or node.name not in translated_names:
+                    return node
+                language = self._language_code or get_language()
+                if language == 'all':
+                    raise ValueError('Cannot update shared fields from translated fields '
+                                     'with language(\'all\')')
+                if self._language_fallbacks:
+                    # Objects matched through a fallback have no translation in language
+                    raise ValueError('Cannot update shared fields from translated fields '
+                                     'with fallbacks()')
+                return CorrelatedColumn(self.model._meta.get_field(node.name),
+                                        key=master, outer_key=self.shared_model._meta.pk,
+                                        restrictions=((self.model._meta.get_field('language_code'),
+                                                       language),))
+            else:
+                if node.name in translated_names or node.name not in self.shared_local_field_names:
+                    return node
+                field = self.shared_model._meta.get_field(node.name)
+                if not field.concrete or field.many_to_many:
+                    raise FieldError('Cannot update from non-concrete field %r' % node.name)
+                return CorrelatedColumn(field, key=self.shared_model._meta.pk, outer_key=master)
+        return map_expression(expr, correlate)
+
     def _translate_fieldnames(self, fieldnames):
         return [name if name in self.query.annotations
                      else self.field_translator(name)
@@ -345,12 +465,339 @@ class TranslationQueryset(QuerySet):
         else: # pragma: no cover
             return klass
 
+    def _get_fallback_languages(self):
+        return tuple(get_language() if lang is None else lang
+                     for lang in (self._language_code,) + self._language_fallbacks)
+
+    def _filters_shared_only(self):
+        """ Tells whether the query only puts constraints on shared fields,
+            in which case it matches either all translations of an object, or none.
+        """
+        query = self.query
+        columns = where_columns(query.where)
+        if columns is None:
+            return False
+
+        master = self.model._meta.get_field('master')
+        base = query.get_initial_alias()
+        master_aliases = set(alias for alias, join in query.alias_map.items()
+                             if join.parent_alias == base and join.join_field is master)
+        return all(column.alias in master_aliases or
+                   (column.alias == base and column.target is master)
+                   for column in columns)
+
+    def _prime_available_languages(self, objects):
+        """ Caches available languages on objects loaded by an unrestricted
+            language('all') query, as they come with all their translations.
+        """
+        query = self.query
+        if (self._language_code != 'all' or query.low_mark or query.high_mark is not None or
+                query.distinct or getattr(query, 'combinator', None) or
+                not self._filters_shared_only()):
+            return
+        objects = [obj for obj in objects if isinstance(obj, self.shared_model)]
+        languages = {}
+        for obj in objects:
+            languages.setdefault(obj.pk, []).append(obj.language_code)
+        for obj in objects:
+            set_cached_languages(obj, languages[obj.pk])
+
+    def _without_available_languages(self):
+        """ Returns a queryset without annotate_available_languages() annotations.
+            They do not change which objects match, and would prevent simple counting.
+        """
+        query = self.query
+        aliases = set(alias for alias, annotation in query.annotations.items()
+                      if isinstance(annotation, AvailableLanguages))
+        if not aliases:
+            return self
+        qs = self._clone()
+        for alias in aliases:
+            del qs.query.annotations[alias]
+        if qs.query.annotation_select_mask is not None:
+            qs.query.annotation_select_mask.difference_update(aliases)
+        qs.query._annotation_select_cache = None
+        qs._hvad_switch_fields = tuple(name for name in qs._hvad_switch_fields
+                                       if name not in aliases)
+        return qs
+
+    def _get_fallbacks_count_queryset(self):
+        """ Returns a plain queryset on translations, matching the same objects as
+            this one, if it has fallbacks and only filters on shared fields.
+            Fallbacks then only choose which translation is loaded, so objects
+            can be counted without ranking translations. Returns None otherwise.
+            Strategies resolving fallbacks in python filter candidate translations,
+            so they can always be counted that way.
+        """
+        query = self.query
+        if (not self._language_fallbacks or self._language_code == 'all' or
+                query.distinct or query.low_mark or query.high_mark is not None or
+                query.extra or query.extra_tables or query.annotations or
+                getattr(query, 'combinator', None)):
+            return None
+        strategy = get_strategy(self._fallbacks_strategy, connections[self.db])
+        if not strategy.resolves_in_python and not self._filters_shared_only():
+            return None
+
+        qs = super(TranslationQueryset, self)._clone()
+        qs.__class__ = QuerySet
+        if strategy.restricts_languages:
+            qs = qs.filter(language_code__in=self._get_fallback_languages())
+        return qs
+
+    def _get_prefetch_queryset(self):
+        """ Returns a plain queryset on the shared model, matching the same objects
+            in the same order, if the prefetch loading strategy is enabled and the
+            query only filters and orders on shared fields. Returns None otherwise.
+        """
+        query = self.query
+        if (self._loading_strategy != 'prefetch' or self._language_code == 'all' or
+                self._fallbacks_per_field or self._raw_select_related or
+                self._hvad_switch_fields or
+                isinstance(self._fallbacks_strategy, LanguagesStrategy) or
+                query.distinct_fields or query.extra or query.extra_tables or
+                query.extra_order_by or query.annotations or query.select_for_update or
+                query.deferred_loading[0] or getattr(query, 'combinator', None) or
+                not self._filters_shared_only()):
+            return None
+
+        ordering = []
+        for name in query.order_by:
+            if name == '?':
+                ordering.append(name)
+                continue
+            if not isinstance(name, string_types):
+                return None
+            prefix, bare = ('-', name[1:]) if name.startswith('-') else ('', name)
+            if not bare.startswith('master__'):
+                return None
+            ordering.append(prefix + bare[8:])
+
+        base = query.get_initial_alias()
+        shared_qs = QuerySet(self.shared_model, using=self.db)
+        shared_base = shared_qs.query.get_initial_alias()
+        shared_pk = self.shared_model._meta.pk
+
+        def rebase(column):
+            if column.alias == base:    # master_id column, see _filters_shared_only
+                return shared_pk.get_col(shared_base)
+            return column.relabeled_clone({column.alias: shared_base})
+        shared_qs.query.where = map_where_columns(query.where, rebase)
+
+        # Only keep translated objects, in the same languages as the strategy
+        # used by count() and exists() would
+        translations = self.model._base_manager.db_manager(self.db).all()
+        if self._prefetch_restricts_languages():
+            translations = translations.filter(language_code__in=self._get_prefetch_languages())
+        shared_qs = shared_qs.filter(pk__in=translations.values('master'))
+
+        if query.order_by:
+            shared_qs = shared_qs.order_by(*ordering)
+        elif not query.default_ordering:
+            shared_qs = shared_qs.order_by()
+        if query.distinct:
+            shared_qs = shared_qs.distinct()
+        shared_qs.query.set_limits(query.low_mark, query.high_mark)
+        shared_qs._known_related_objects = self._known_related_objects
+        return shared_qs
+
+    def _get_prefetch_languages(self):
+        if self._language_fallbacks:
+            return self._get_fallback_languages()
+        return (self._language_code or get_language(),)
+
+    def _prefetch_restricts_languages(self):
+        """ Whether objects missing all prefetch languages are left out. With
+            fallbacks, this depends on the fallbacks strategy: the join strategy
+            keeps them, with a translation in another language.
+        """
+        if not self._language_fallbacks:
+            return True
+        return get_strategy(self._fallbacks_strategy, connections[self.db]).restricts_languages
+
+    def _iterate_prefetched(self, shared_qs):
+        """ Iterates objects of shared_qs, loading the best ranking translation
+            of objects a chunk at a time, and yields them combined.
+            With fallbacks, translations in other languages rank last, lowest
+            primary key first, as with the join strategy.
+        """
+        languages = self._get_prefetch_languages()
+        rank = dict((code, index) for index, code in reversed(list(enumerate(languages))))
+        translations = self.model._base_manager.db_manager(self.db).all()
+        if self._prefetch_restricts_languages():
+            translations = translations.filter(language_code__in=languages)
+
+        def sort_key(translation):
+            return rank.get(translation.language_code, len(languages)), translation.pk
+
+        objects = shared_qs.iterator()
+        while True:
+            chunk = list(islice(objects, GET_ITERATOR_CHUNK_SIZE))
+            if not chunk:
+                return
+            best = {}
+            for translation in translations.filter(master_id__in=[obj.pk for obj in chunk]):
+                current = best.get(translation.master_id)
+                if current is None or sort_key(translation) < sort_key(current):
+                    best[translation.master_id] = translation
+            for obj in chunk:
+                translation = best.get(obj.pk)
+                if translation is None: # pragma: no cover (deleted in between)
+                    continue
+                translation.master = obj
+                set_cached_translation(obj, translation)
+                yield obj
+
     def _get_shared_queryset(self):
         qs = super(TranslationQueryset, self)._clone()
         qs.__class__ = QuerySet
-        accessor = self.shared_model._meta.translations_accessor
         # update using the real manager
-        return QuerySet(self.shared_model, using=self.db).filter(**{'%s__in' % accessor: qs})
+        shared_qs = QuerySet(self.shared_model, using=self.db)
+        if not connections[self.db].features.update_can_self_select:
+            # Translations may join the shared table, let Django load pks first
+            accessor = self.shared_model._meta.translations_accessor
+            return shared_qs.filter(**{'%s__in' % accessor: qs})
+        # Select masters directly, so the shared table is not joined to translations
+        if qs.query.low_mark == 0 and qs.query.high_mark is None:
+            qs.query.clear_ordering(force_empty=True)
+        return shared_qs.filter(pk__in=qs.values('master'))
+
+    def _extract_lookup(self, kwargs):
+        lookup = kwargs.copy()
+        for f in self.model._meta.fields:
+            if f.attname in lookup:
+                lookup[f.name] = lookup.pop(f.attname)
+        return lookup
+
+    def _extract_create_params(self, kwargs, defaults, method):
+        params = dict([(k, v) for k, v in kwargs.items() if '__' not in k])
+        params.update(defaults)
+
+        if 'language_code' not in params:
+            params['language_code'] = self._language_code or get_language()
+        elif self._language_code is not None:
+            raise ValueError('Overriding language_code in %s() is not allowed. '
+                             'Please set the language with language() instead.' % method)
+
+        if params['language_code'] == 'all':
+            raise ValueError('Cannot create an object with language \'all\'')
+        return params
+
+    def _create_object_from_params(self, lookup, params):
+        obj = self.shared_model(**params)
+        try:
+            with transaction.atomic(using=self.db):
+                obj.save(force_insert=True, using=self.db)
+            return obj, True
+        except IntegrityError:
+            exc_info = sys.exc_info()
+            try:
+                return self.get(**lookup), False
+            except self.model.DoesNotExist:
+                raise exc_info[1]
+
+    def _get_upsert_conflict(self, lookup, defaults):
+        """ Returns the names of shared fields identifying the object if lookup
+            matches a unique constraint of the shared model, and upserts can
+            be used for it. Returns None otherwise.
+        """
+        if not upsert_supported(connections[self.db]):
+            return None
+        # Upserts write rows directly, which would bypass custom save() and model signals
+        from hvad.models import BaseTranslationModel, TranslatableModel
+        for model, base in ((self.shared_model, TranslatableModel),
+                            (self.model, BaseTranslationModel)):
+            save = next(klass.__dict__['save'] for klass in model.__mro__ if 'save' in klass.__dict__)
+            if save is not base.__dict__['save']:
+                return None
+            if signals.pre_save.has_listeners(model) or signals.post_save.has_listeners(model):
+                return None
+        opts = self.shared_model._meta
+        shared_fields = dict((f.name, f) for f in opts.concrete_fields)
+        shared_fields.update((f.attname, f) for f in opts.concrete_fields)
+        shared_fields['pk'] = opts.pk
+        translated_fields = set(chain.from_iterable((f.name, f.attname)
+                                                    for f in self.model._meta.concrete_fields))
+        if not all(key in shared_fields or key in translated_fields for key in defaults):
+            return None
+
+        names = set()
+        for key in lookup:
+            if key == 'language_code':
+                continue
+            try:
+                names.add(shared_fields[key].name)
+            except KeyError:
+                return None
+
+        candidates = [(opts.pk.name,)]
+        candidates.extend((f.name,) for f in opts.concrete_fields if f.unique)
+        candidates.extend(opts.unique_together)
+        for candidate in candidates:
+            if set(candidate) == names:
+                return tuple(candidate)
+        return None
+
+    def _upsert_object(self, params, conflict, shared_update, translated_update):
+        """ Upserts shared and translated rows, see hvad.query.upsert.
+            Object is deemed created if its translation was created.
+        """
+        connection = connections[self.db]
+        obj = self.shared_model(**params)
+        translation = get_cached_translation(obj)
+        with transaction.atomic(using=self.db, savepoint=False):
+            upsert(connection, obj, conflict, shared_update)
+            translation.master = obj
+            created = upsert(connection, translation, ('language_code', 'master'),
+                             translated_update)
+        return obj, created
+
+    def _insert_shared_one_by_one(self, objs):
+        opts = self.shared_model._meta
+        fields = [field for field in opts.concrete_fields
+                  if not isinstance(field, models.AutoField)]
+        qs = QuerySet(self.shared_model, using=self.db)
+        for obj in objs:
+            pk = qs._insert([obj], fields=fields, return_id=True, using=self.db)
+            setattr(obj, opts.pk.attname, pk)
+
+    def _load_translation_pks(self, translations, batch_size=None):
+        """ Sets primary keys of bulk inserted translations, on databases that
+            cannot return them. Translations are matched on (master, language_code).
+        """
+        if not translations:
+            return
+        pk_attname = self.model._meta.pk.attname
+        batch_size = batch_size or max(
+            connections[self.db].ops.bulk_batch_size(['master', 'language_code'], translations), 1)
+        qs = QuerySet(self.model, using=self.db)
+        for start in range(0, len(translations), batch_size):
+            batch = dict(((translation.master_id, translation.language_code), translation)
+                         for translation in translations[start:start + batch_size])
+            rows = qs.filter(master__in=set(key[0] for key in batch),
+                             language_code__in=set(key[1] for key in batch))
+            for master_id, language_code, pk in rows.values_list('master', 'language_code', 'pk'):
+                translation = batch.get((master_id, language_code))
+                if translation is not None:
+                    setattr(translation, pk_attname, pk)
+
+    def _get_bulk_translations(self, obj):
+        """ Translations to insert along with obj: the cached translation, then
+            other translations known to obj, then any translation in the
+            prefetch cache of the translations accessor.
+            A single translation per language is kept, cached one first.
+        """
+        seen = set()
+        translation = get_cached_translation(obj)
+        if translation is not None:
+            seen.add(translation.language_code)
+            yield translation
+        accessor = obj._meta.translations_accessor
+        prefetched = getattr(obj, '_prefetched_objects_cache', {}).get(accessor, ())
+        for translation in chain(get_cached_translations(obj).values(), prefetched):
+            if translation.language_code not in seen:
+                seen.add(translation.language_code)
+                yield translation
 
     def _add_select_related(self, language_code):
         fields = self._raw_select_related
@@ -360,103 +807,71 @@ class TranslationQueryset(QuerySet):
         if not self._skip_master_select and getattr(self, '_fields', None) is None:
             related_queries.append('master')
 
+        lookup_cache = get_lookup_cache(self.shared_model)
         for query_key in fields:
-            newbits = []
-            for term in query_terms(self.shared_model, query_key):
-
-                # Translate term
-                if term.depth == 0 and not term.translated:
-                    # on initial depth we must key to shared model
-                    newbits.append('master__%s' % term.term)
-                elif term.depth > 0 and term.translated:
-                    # on deeper levels we must key to translations model
-                    # this will work because translations will be seen as _unique
-                    # at query time
-                    newbits.append('%s__%s' % (term.model._meta.translations_accessor, term.term))
-                else:
-                    newbits.append(term.term)
-
-                # Some helpful messages for common mistakes
-                if term.many:
-                    raise FieldError('Cannot select_related: %s can be multiple objects. '
-                                     'Use prefetch_related instead.' % query_key)
-                if term.target is None:
-                    raise FieldError('Cannot select_related: %s is a regular field' % query_key)
-                if hasattr(term.field.rel, 'through'):
-                    raise FieldError('Cannot select_related: %s can be multiple objects. '
-                                     'Use prefetch_related instead.' % query_key)
-
-                # If target is a translated model, select its translations
-                target_translations = getattr(term.target._meta, 'translations_accessor', None)
-                if target_translations is not None:
-                    # Add the model
-                    target_query = '__'.join(newbits)
-                    related_queries.append('%s__%s' % (target_query, target_translations))
-
-                    # Add a language filter for the translation
-                    language_filters.append('%s__%s__language_code' % (
-                        target_query,
-                        target_translations,
-                    ))
-
-                    # Remember to mark the field unique so JOIN is generated
-                    # and row decoder gets cached items
-                    if django.VERSION >= (1, 9):
-                        target_transfield = getattr(term.target, target_translations).field
-                    else:
-                        target_transfield = getattr(term.target, target_translations).related.field
-                    force_unique_fields.append(target_transfield)
-
-            related_queries.append('__'.join(newbits))
+            queries, filters, unique_fields = lookup_cache.get('select_related', query_key,
+                                                               resolve_select_related)
+            related_queries.extend(queries)
+            language_filters.extend(filters)
+            force_unique_fields.extend(unique_fields)
 
         # Apply results to query
         self.query.add_select_related(related_queries)
-        for language_filter in language_filters:
-            self.query.add_q(Q(**{language_filter: language_code}) |
-                             Q(**{language_filter: None}))
+        for language_filter, translations_model in language_filters:
+            if isinstance(language_code, tuple):
+                # Fallbacks: join translations ahead of select_related, so it
+                # reuses the join, and keep only the best one for each object
+                joins = self.query.setup_joins(language_filter.split(LOOKUP_SEP)[:-1],
+                                               self.model._meta,
+                                               self.query.get_initial_alias())[3]
+                self.query.promote_joins(joins)
+                self.query.where.add(BestTranslationConstraint(
+                    translations_model, joins[-1], language_code
+                ), AND)
+            else:
+                self.query.add_q(Q(**{language_filter: language_code}) |
+                                 Q(**{language_filter: None}))
 
-        self._forced_unique_fields = force_unique_fields
+        self._forced_unique_fields = tuple(force_unique_fields)
 
-    def _add_language_filter(self):
+    def _add_language_filter(self, iterating=False):
+        """ Applies language filter. Set iterating if the query will be used
+            to load model instances, as opposed to values or updates.
+        """
         if self._language_filter_tag: # pragma: no cover
             raise RuntimeError('Queryset is already tagged. This is a bug in hvad')
         self._language_filter_tag = True
 
+        # if queryset is about to use the model's default ordering, we
+        # override that now with a translated version of the model's ordering
+        if self.query.default_ordering and not self.query.order_by:
+            ordering = self.shared_model._meta.ordering
+            self.query.order_by = self._translate_fieldnames(ordering or [])
+
         if self._language_code == 'all':
             self._add_select_related(F('language_code'))
 
         elif self._language_fallbacks:
-            if self._raw_select_related:
-                raise NotImplementedError('Using select_related along with '
-                                          'fallbacks() is not supported')
-            languages = tuple(get_language() if lang is None else lang
-                              for lang in (self._language_code,) + self._language_fallbacks)
-            masteratt = self.model._meta.get_field('master').attname
-            alias = self.query.join(Join(
-                self.model._meta.db_table,
-                self.query.get_initial_alias(),
-                None,
-                LOUTER,
-                BetterTranslationsField(languages, master=masteratt),
-                True
-            ))
-
-            add_alias_constraints(self, (self.model, alias), id__isnull=True)
-            self.query.add_filter(('%s__isnull' % masteratt, False))
-            if not self._skip_master_select and getattr(self, '_fields', None) is None:
-                self.query.add_select_related(('master',))
+            languages = self._get_fallback_languages()
+            strategy = get_strategy(self._fallbacks_strategy, connections[self.db])
+            if strategy.resolves_in_python and not iterating:
+                raise NotImplementedError('The %s fallbacks strategy can only be used '
+                                          'to load model instances' % strategy.name)
+            resolver = strategy.apply(self, languages)
+            if self._fallbacks_per_field and iterating:
+                merge = add_field_fallbacks(self, languages)
+                if resolver is None:
+                    resolver = merge
+                else:
+                    resolver = lambda objects, pick=resolver: merge(pick(objects))
+            self._fallbacks_resolver = resolver
+            self._add_select_related(languages)
 
         else:
             language_code = self._language_code or get_language()
             self.query.add_filter(('language_code', language_code))
             self._add_select_related(language_code)
 
-        # if queryset is about to use the model's default ordering, we
-        # override that now with a translated version of the model's ordering
-        if self.query.default_ordering and not self.query.order_by:
-            ordering = self.shared_model._meta.ordering
-            self.query.order_by = self._translate_fieldnames(ordering or [])
-
         return self
 
     def _use_related_translations(self, obj, relations_dict, depth=0):
@@ -479,7 +894,10 @@ class TranslationQueryset(QuerySet):
                 pass
             else:
                 delattr(obj, cache)
-                setattr(obj, obj._meta.translations_cache, translation)
+                if translation is None:
+                    setattr(obj, obj._meta.translations_cache, None)
+                else:
+                    set_cached_translation(obj, translation)
 
         # Then recurse in the relation dict
         for field, sub_dict in relations_dict.items():
@@ -496,34 +914,88 @@ class TranslationQueryset(QuerySet):
         self._language_code = language_code
         return self
 
-    def fallbacks(self, *fallbacks):
+    def languages(self, *languages):
+        """ Loads each object once, in the first of given languages it has a
+            translation in, with all its translations in given languages in its
+            translations prefetch cache.
+        """
+        if not languages:
+            raise ValueError('languages() requires at least one language')
+        if 'all' in languages:
+            raise ValueError('Value "all" is invalid for languages()')
+        self._language_code = languages[0]
+        # Always go through the strategy, even for a single language
+        self._language_fallbacks = languages[1:] or languages[:1]
+        self._fallbacks_strategy = LANGUAGES_STRATEGY
+        self._fallbacks_per_field = False
+        return self
+
+    def fallbacks(self, *fallbacks, **kwargs):
+        strategy = kwargs.pop('strategy', None)
+        per_field = kwargs.pop('per_field', False)
+        if kwargs:
+            raise TypeError('fallbacks() got an unexpected keyword argument %r' %
+                            next(iter(kwargs)))
+        if not (strategy is None or strategy in STRATEGIES or
+                isinstance(strategy, FallbackStrategy)):
+            raise ValueError('Unknown fallbacks strategy %r' % strategy)
+
         if not fallbacks:
             self._language_fallbacks = hvad_settings.FALLBACK_LANGUAGES
         elif fallbacks == (None,):
             self._language_fallbacks = None
         else:
             self._language_fallbacks = fallbacks
+        self._fallbacks_strategy = strategy
+        self._fallbacks_per_field = per_field
         return self
 
+    def strategy(self, name):
+        """ Selects how objects and their translations are loaded:
+            - 'join' loads translations joined to their shared object (default).
+            - 'prefetch' loads shared objects alone, then their translations.
+        """
+        if name not in ('join', 'prefetch'):
+            raise ValueError('Unknown loading strategy %r' % name)
+        self._loading_strategy = name
+        return self
+
+    def annotate_available_languages(self):
+        """ Loads the list of languages each object is available in, using an
+            aggregating subquery, so get_available_languages() needs no query.
+        """
+        return self.annotate(**{
+            self.shared_model._meta.translations_languages:
+                AvailableLanguages(self.model, self.model._meta.get_field('master')),
+        })
+
     #===========================================================================
     # Queryset/Manager API that do database queries
     #===========================================================================
 
     if django.VERSION < (1, 9):
         def iterator(self):
-            qs = self._clone()._add_language_filter()
+            qs = self._clone()
+            shared_qs = qs._get_prefetch_queryset()
+            if shared_qs is not None:
+                for obj in qs._iterate_prefetched(shared_qs):
+                    yield obj
+                return
+
+            qs = qs._add_language_filter(iterating=True)
             qs._known_related_objects = {}  # super's iterator will attempt to set them
+            objects = super(TranslationQueryset, qs).iterator()
+            related = None
             if qs._forced_unique_fields:
-                with ForcedUniqueFields(qs._forced_unique_fields):
-                    objects = list(super(TranslationQueryset, qs).iterator())
-
+                objects = iterate_forcing_unique(qs._forced_unique_fields, objects)
                 if type(qs.query.select_related) == dict:
-                    for obj in objects:
-                        qs._use_related_translations(obj, qs.query.select_related)
-            else:
-                objects = super(TranslationQueryset, qs).iterator()
+                    related = qs.query.select_related
+            if qs._fallbacks_resolver is not None:
+                objects = qs._fallbacks_resolver(objects)
 
             for obj in objects:
+                if related is not None:
+                    qs._use_related_translations(obj, related)
                 for name in self._hvad_switch_fields:
                     try:
                         setattr(obj.master, name, getattr(obj, name))
@@ -560,16 +1032,30 @@ class TranslationQueryset(QuerySet):
         obj.save(force_insert=True, using=self.db)
         return obj
 
+    def _fetch_all(self):
+        fetching = self._result_cache is None
+        super(TranslationQueryset, self)._fetch_all()
+        if fetching:
+            self._prime_available_languages(self._result_cache)
+
     def count(self):
         if self._result_cache is None:
-            qs = self._clone()._add_language_filter()
+            qs = self._without_available_languages()
+            count_qs = qs._get_fallbacks_count_queryset()
+            if count_qs is not None:
+                return count_qs.aggregate(count=Count('master', distinct=True))['count']
+            qs = qs._clone()._add_language_filter()
             return super(TranslationQueryset, qs).count()
         else:
             return len(self._result_cache)
 
     def exists(self):
         if self._result_cache is None:
-            qs = self._clone()._add_language_filter()
+            qs = self._without_available_languages()
+            count_qs = qs._get_fallbacks_count_queryset()
+            if count_qs is not None:
+                return count_qs.exists()
+            qs = qs._clone()._add_language_filter()
             return super(TranslationQueryset, qs).exists()
         else:
             return bool(self._result_cache)
@@ -583,45 +1069,164 @@ class TranslationQueryset(QuerySet):
         assert kwargs, \
                 'get_or_create() must be passed at least one keyword argument'
         defaults = kwargs.pop('defaults', {})
-        lookup = kwargs.copy()
-        for f in self.model._meta.fields:
-            if f.attname in lookup:
-                lookup[f.name] = lookup.pop(f.attname)
+        lookup = self._extract_lookup(kwargs)
         try:
             self._for_write = True
             return self.get(**lookup), False
         except self.model.DoesNotExist:
             pass
 
-        params = dict([(k, v) for k, v in kwargs.items() if '__' not in k])
-        params.update(defaults)
+        params = self._extract_create_params(kwargs, defaults, 'get_or_create')
+        return self._create_object_from_params(lookup, params)
 
-        if 'language_code' not in params:
-            params['language_code'] = self._language_code or get_language()
-        elif self._language_code is not None:
-            raise ValueError('Overriding language_code in get_or_create() is not allowed. '
-                             'Please set the language with language() instead.')
+    def update_or_create(self, defaults=None, **kwargs):
+        """
+        Looks up an object with the given kwargs, updating it with defaults
+        if it exists, otherwise creates a new one.
+        Returns a tuple of (object, created), where created is a boolean
+        specifying whether an object was created.
+        """
+        defaults = defaults or {}
+        lookup = self._extract_lookup(kwargs)
+        params = self._extract_create_params(kwargs, defaults, 'update_or_create')
+        self._for_write = True
 
-        if params['language_code'] == 'all':
-            raise ValueError('Cannot create an object with language \'all\'')
+        conflict = self._get_upsert_conflict(lookup, defaults)
+        if conflict is not None:
+            shared, translated = self._split_kwargs(**defaults)
+            return self._upsert_object(params, conflict, shared, translated)
 
-        obj = self.shared_model(**params)
-        try:
-            with transaction.atomic(using=self.db):
-                obj.save(force_insert=True, using=self.db)
-            return obj, True
-        except IntegrityError:
-            exc_info = sys.exc_info()
+        with transaction.atomic(using=self.db):
             try:
-                return self.get(**lookup), False
+                obj = self.select_for_update().get(**lookup)
             except self.model.DoesNotExist:
-                raise exc_info[1]
-
-    def update_or_create(self, defaults=None, **kwargs):
-        raise NotImplementedError()
+                obj, created = self._create_object_from_params(lookup, params)
+                if created:
+                    return obj, created
+            for key, value in defaults.items():
+                setattr(obj, key, value)
+            obj.save(using=self.db)
+        return obj, False
 
     def bulk_create(self, objs, batch_size=None):
-        raise NotImplementedError()
+        """
+        Inserts shared instances in batches, then all their translations
+        in batches. Returns objs, like Django's bulk_create does.
+
+        Primary keys of shared instances are required to insert translations.
+        If the database cannot return them from a bulk insert, instances that
+        have no primary key set are inserted one by one, and primary keys of
+        translations are loaded back after inserting them.
+        """
+        assert batch_size is None or batch_size > 0
+        objs = list(objs)
+        if not objs:
+            return objs
+        translations = []
+        for obj in objs:
+            if not isinstance(obj, self.shared_model._meta.concrete_model):
+                raise TypeError('bulk_create() expects instances of %s, got %r' %
+                                (self.shared_model.__name__, obj))
+            for translation in self._get_bulk_translations(obj):
+                if translation.language_code == 'all':
+                    raise ValueError('Cannot create an object with language \'all\'')
+                translations.append((obj, translation))
+
+        self._for_write = True
+        connection = connections[self.db]
+        shared_qs = QuerySet(self.shared_model, using=self.db)
+        with transaction.atomic(using=self.db, savepoint=False):
+            if getattr(connection.features, 'can_return_ids_from_bulk_insert', False):
+                shared_qs.bulk_create(objs, batch_size=batch_size)
+            else:
+                shared_qs.bulk_create([obj for obj in objs if obj.pk is not None],
+                                      batch_size=batch_size)
+                self._insert_shared_one_by_one([obj for obj in objs if obj.pk is None])
+
+            for obj, translation in translations:
+                translation.master = obj
+            QuerySet(self.model, using=self.db).bulk_create(
+                [translation for obj, translation in translations],
+                batch_size=batch_size
+            )
+            self._load_translation_pks([translation for obj, translation in translations
+                                        if translation.pk is None], batch_size)
+
+        for instance in chain(objs, (translation for obj, translation in translations)):
+            instance._state.adding = False
+            instance._state.db = self.db
+        return objs
+    bulk_create.alters_data = True
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        """
+        Updates given fields of shared instances, and of their cached translation
+        for translated fields, with one CASE-based UPDATE per table and batch.
+        Returns the number of updated objects, like Django's bulk_update does.
+        """
+        assert batch_size is None or batch_size > 0
+        if not fields:
+            raise ValueError('Field names must be given to bulk_update().')
+        objs = list(objs)
+        shared_fields, translated_fields = [], []
+        for name in fields:
+            if name in self.shared_local_field_names:
+                field = self.shared_model._meta.get_field(name)
+                shared_fields.append(field)
+            else:
+                field = self.model._meta.get_field(name)
+                translated_fields.append(field)
+            if (not field.concrete or field.primary_key or field.many_to_many or
+                    field.name in ('master', 'language_code')):
+                raise ValueError('bulk_update() can only be used with concrete, '
+                                 'non primary key fields, got %r.' % name)
+
+        translations = []
+        for obj in objs:
+            if obj.pk is None:
+                raise ValueError('All bulk_update() objects must have a primary key set.')
+            if translated_fields:
+                translation = get_cached_translation(obj)
+                if translation is None or translation.pk is None:
+                    raise ValueError('Translated fields cannot be updated on %r: it has '
+                                     'no saved translation loaded.' % obj)
+                translations.append(translation)
+
+        shared_count = translated_count = 0
+        with transaction.atomic(using=self.db, savepoint=False):
+            if shared_fields:
+                shared_count = self._bulk_update_rows(self.shared_model, objs,
+                                                      shared_fields, batch_size)
+            if translated_fields:
+                translated_count = self._bulk_update_rows(self.model, translations,
+                                                          translated_fields, batch_size)
+        # Each object has one row in each table
+        return max(shared_count, translated_count)
+    bulk_update.alters_data = True
+
+    def _bulk_update_rows(self, model, instances, fields, batch_size):
+        connection = connections[self.db]
+        if batch_size is None:
+            batch_size = connection.ops.bulk_batch_size(['pk', 'pk'] + fields, instances)
+        batch_size = max(batch_size, 1)
+        # PostgreSQL types CASE results from parameters as text
+        cast = connection.vendor == 'postgresql' and django.VERSION >= (1, 10)
+        qs = QuerySet(model, using=self.db)
+        count = 0
+        for start in range(0, len(instances), batch_size):
+            batch = instances[start:start + batch_size]
+            updates = {}
+            for field in fields:
+                whens = []
+                for obj in batch:
+                    value = getattr(obj, field.attname)
+                    if not hasattr(value, 'resolve_expression'):
+                        value = Value(value, output_field=field)
+                    whens.append(When(pk=obj.pk, then=value))
+                case = Case(*whens, output_field=field)
+                updates[field.name] = Cast(case, output_field=field) if cast else case
+            count += qs.filter(pk__in=[obj.pk for obj in batch]).update(**updates)
+        return count
 
     def aggregate(self, *args, **kwargs):
         """
@@ -643,42 +1248,154 @@ class TranslationQueryset(QuerySet):
         field_name = self.field_translator(field_name or self.shared_model._meta.get_latest_by)
         return super(TranslationQueryset, self).earliest(field_name)
 
-    def in_bulk(self, id_list):
-        if not id_list:
-            return {}
-        if self._language_code == 'all':
-            raise ValueError('Cannot use in_bulk along with language(\'all\').')
-        qs = self.filter(pk__in=id_list)
-        qs.query.clear_ordering(force_empty=True)
-        return dict((obj._get_pk_val(), obj) for obj in qs.iterator())
+    def in_bulk(self, id_list=None, field_name='pk', batch_size=None):
+        """
+        Returns a dictionary mapping each of the given values of field_name to
+        the object with that value, looking them up batch_size values at a time.
+        With language('all'), each value is mapped to a dictionary of objects,
+        by language code.
+        """
+        if field_name != 'pk' and not self.shared_model._meta.get_field(field_name).unique:
+            raise ValueError('in_bulk()\'s field_name must be a unique field '
+                             'but %r isn\'t.' % field_name)
+        if id_list is not None:
+            id_list = tuple(id_list)
+            if not id_list:
+                return {}
+            if batch_size is None:
+                batch_size = connections[self.db].ops.bulk_batch_size([field_name], id_list)
+            batch_size = max(batch_size, 1)
+            querysets = (self.filter(**{'%s__in' % field_name: id_list[start:start + batch_size]})
+                         for start in range(0, len(id_list), batch_size))
+        else:
+            querysets = (self._clone(),)
+
+        result = {}
+        for qs in querysets:
+            qs.query.clear_ordering(force_empty=True)
+            for obj in qs.iterator():
+                key = obj._get_pk_val() if field_name == 'pk' else getattr(obj, field_name)
+                if self._language_code == 'all':
+                    result.setdefault(key, {})[obj.language_code] = obj
+                else:
+                    result[key] = obj
+        return result
 
     def delete(self):
+        if self._can_fast_delete():
+            return self.fast_delete()
         qs = self._get_shared_queryset()
-        qs.delete()
+        return qs.delete()
     delete.alters_data = True
     delete.queryset_only = True
 
-    def delete_translations(self):
+    def _can_fast_delete(self):
+        return (can_fast_delete(self.model) and
+                can_fast_delete(self.shared_model, ignore=(self.model,)))
+
+    def fast_delete(self, batch_size=None):
+        """ Deletes matched objects and their translations without the collector:
+            primary keys of matched objects are walked in order, batch_size at
+            a time, and translations then objects of each batch are deleted
+            with one statement each. No signal is sent and no cascade is run.
+            Returns the same counts as QuerySet.delete().
+        """
+        # Objects are matched through their translations, so they can no longer
+        # be found once those are deleted: they must be identified beforehand.
+        pk_qs = self._get_shared_queryset().values_list('pk', flat=True).order_by('pk')
+        batch_size = max(batch_size or GET_ITERATOR_CHUNK_SIZE, 1)
+        sliced = self.query.low_mark or self.query.high_mark is not None
+
+        def batches():
+            if sliced:
+                # A slice would match other objects once the first ones are deleted
+                pks = list(pk_qs)
+                for start in range(0, len(pks), batch_size):
+                    yield pks[start:start + batch_size]
+                return
+            batch_qs = pk_qs
+            while True:
+                pks = list(batch_qs[:batch_size])
+                if pks:
+                    yield pks
+                if len(pks) < batch_size:
+                    break
+                batch_qs = pk_qs.filter(pk__gt=pks[-1])
+
+        master_attname = self.model._meta.get_field('master').attname
+        translations_count = shared_count = 0
+        with transaction.atomic(using=self.db, savepoint=False):
+            for batch in batches():
+                translations_count += raw_delete(self.model, self.db,
+                                                 **{'%s__in' % master_attname: batch})
+                shared_count += raw_delete(self.shared_model, self.db, pk__in=batch)
+
+        counts = {}
+        for model, count in ((self.model, translations_count),
+                             (self.shared_model, shared_count)):
+            if count:
+                counts['%s.%s' % (model._meta.app_label, model._meta.object_name)] = count
+        return translations_count + shared_count, counts
+    fast_delete.alters_data = True
+    fast_delete.queryset_only = True
+
+    def delete_translations(self, batch_size=None, commit_batches=False):
+        """ Deletes matched translations. If batch_size is given, or the backend
+            cannot select from the table it deletes from, translations are
+            deleted batch_size at a time, walking their primary keys in order.
+            - commit_batches: run each batch in its own transaction instead of
+              a single one for the whole deletion.
+        """
         qs = self._clone()._add_language_filter()
-        if connections[self._db].features.update_can_self_select:
+        if batch_size is None and connections[self._db].features.update_can_self_select:
             super(TranslationQueryset, qs).delete()
+            return
+
+        qs = (super(TranslationQueryset, qs) if django.VERSION >= (1, 9) else
+              super(TranslationQueryset, self))
+        # Work on the query directly, as hvad would map 'pk' to the shared object's
+        pk_name = self.model._meta.pk.name
+        pk_qs = qs.values_list(pk_name, flat=True)
+        pk_qs.query.clear_ordering(force_empty=True)
+        pk_qs.query.add_ordering(pk_name)
+        batch_size = max(batch_size or GET_ITERATOR_CHUNK_SIZE, 1)
+        manager = self.model._base_manager.db_manager(self._db)
+
+        def batches():
+            batch_qs = pk_qs
+            while True:
+                pks = list(batch_qs[:batch_size])
+                if pks:
+                    yield pks
+                if len(pks) < batch_size:
+                    break
+                batch_qs = pk_qs._clone()
+                batch_qs.query.add_filter(('%s__gt' % pk_name, pks[-1]))
+
+        if commit_batches:
+            for pks in batches():
+                with transaction.atomic(using=self._db):
+                    manager.filter(pk__in=pks).delete()
         else:
             with transaction.atomic(using=self._db, savepoint=False):
-                qs = (super(TranslationQueryset, qs) if django.VERSION >= (1, 9) else
-                      super(TranslationQueryset, self))
-                pks = list(qs.values_list('pk', flat=True))
-                self.model._base_manager.filter(pk__in=pks).delete()
+                for pks in batches():
+                    manager.filter(pk__in=pks).delete()
     delete_translations.alters_data = True
 
     def update(self, **kwargs):
         qs = self._clone()._add_language_filter()
         shared, translated = qs._split_kwargs(**kwargs)
         count = 0
-        if translated:
-            count += super(TranslationQueryset, qs).update(**translated)
-        if shared:
-            shared_qs = qs._get_shared_queryset()
-            count += shared_qs.update(**shared)
+        translated = dict((key, qs._correlate_expression(value, shared=False))
+                          for key, value in translated.items())
+        shared = dict((key, qs._correlate_expression(value, shared=True))
+                      for key, value in shared.items())
+        with transaction.atomic(using=self.db, savepoint=False):
+            if translated:
+                count += super(TranslationQueryset, qs).update(**translated)
+            if shared:
+                shared_qs = qs._get_shared_queryset()
+                count += shared_qs.update(**shared)
         return count
     update.alters_data = True
 
@@ -729,9 +1446,9 @@ class TranslationQueryset(QuerySet):
             raise NotImplementedError('To use select_related on a translated model, '
                                       'you must provide a list of fields.')
         if fields == (None,):
-            self._raw_select_related = []
+            self._raw_select_related = ()
         else:
-            self._raw_select_related.extend(fields)
+            self._raw_select_related += fields
         return self
 
     def complex_filter(self, filter_obj):
@@ -784,6 +1501,31 @@ class TranslationQueryset(QuerySet):
         fieldnames += ('master__%s' % self.shared_model._meta.pk.name, 'master_id', 'language_code')
         return super(TranslationQueryset, self).only(*fieldnames)
 
+#===============================================================================
+# Untranslated queryset
+#===============================================================================
+
+class UntranslatedQueryset(QuerySet):
+    """ Regular queryset, that links instances loaded together so that
+        autoloading translations on them is done in batches.
+        Only instances held in the result cache are linked: those streamed
+        by iterator() are not kept together, so batching cannot apply.
+    """
+    def _fetch_all(self):
+        fetching = self._result_cache is None
+        super(UntranslatedQueryset, self)._fetch_all()
+        if fetching and self._result_cache and isinstance(self._result_cache[0], self.model):
+            link_siblings(self._result_cache)
+
+    def annotate_available_languages(self):
+        """ Loads the list of languages each object is available in, using an
+            aggregating subquery, so get_available_languages() needs no query.
+        """
+        opts = self.model._meta
+        return self.annotate(**{
+            opts.translations_languages: AvailableLanguages(opts.translations_model, opts.pk),
+        })
+
 #===============================================================================
 # TranslationManager
 #===============================================================================
@@ -799,8 +1541,8 @@ class TranslationManager(models.Manager):
     silence_use_for_related_fields_deprecation = True   # Django 1.10
 
     queryset_class = TranslationQueryset
-    fallback_class = QuerySet
-    default_class = TranslationQueryset if hvad_settings.USE_DEFAULT_QUERYSET else QuerySet
+    fallback_class = UntranslatedQueryset
+    default_class = TranslationQueryset if hvad_settings.USE_DEFAULT_QUERYSET else UntranslatedQueryset
 
     def __init__(self, *args, **kwargs):
         self.queryset_class = kwargs.pop('queryset_class', self.queryset_class)
@@ -822,9 +1564,15 @@ class TranslationManager(models.Manager):
     def language(self, language_code=None):
         return self._make_queryset(self.queryset_class, True).language(language_code)
 
+    def languages(self, *languages):
+        return self._make_queryset(self.queryset_class, True).languages(*languages)
+
     def untranslated(self):
         return self._make_queryset(self.fallback_class, True)
 
+    def annotate_available_languages(self):
+        return self.untranslated().annotate_available_languages()
+
     def get_queryset(self):
         return self._make_queryset(self.default_class, False)
 
@@ -837,6 +1585,63 @@ class TranslationManager(models.Manager):
         return self.model._meta.translations_model
 
 
+#===============================================================================
+# Prefetching
+#===============================================================================
+
+class TranslatedPrefetch(Prefetch):
+    """ Prefetches a relation to a translatable model, loading related objects
+        with their translation in given language, using given fallbacks.
+        Related model is only known once prefetching starts, so the queryset
+        is built when the relation is reached.
+    """
+    def __init__(self, lookup, language=None, fallbacks=None, to_attr=None):
+        super(TranslatedPrefetch, self).__init__(lookup, to_attr=to_attr)
+        self.language = language
+        self.fallbacks = fallbacks
+
+    def get_current_queryset(self, level):
+        if self.get_current_prefetch_to(level) == self.prefetch_to:
+            attname = self.prefetch_through.split(LOOKUP_SEP)[level]
+            return PendingTranslationQueryset(self, attname)
+        return None
+
+    def get_queryset(self, model):
+        manager = model._default_manager
+        if not isinstance(manager, TranslationManager):
+            raise TypeError('TranslatedPrefetch only works on translatable models')
+        qs = manager.language(self.language)
+        if self.fallbacks is not None:
+            qs = qs.fallbacks(*self.fallbacks)
+        return qs
+
+
+class PendingTranslationQueryset(object):
+    """ Stands for the queryset of a TranslatedPrefetch until the related model
+        is known. Prefetchers first give it the instance objects are fetched for,
+        using _add_hints(), which builds the actual queryset. Everything else is
+        then forwarded to that queryset.
+    """
+    def __init__(self, prefetch, attname):
+        self.prefetch = prefetch
+        self.attname = attname
+        self.queryset = None
+
+    def _add_hints(self, **hints):
+        instance = hints['instance']
+        descriptor = getattr(type(instance), self.attname)
+        if hasattr(descriptor, 'get_queryset'):     # single-valued relation
+            model = descriptor.get_queryset().model
+        else:                                       # related manager
+            model = getattr(instance, self.attname).model
+        self.queryset = self.prefetch.get_queryset(model)
+        self.queryset._add_hints(**hints)
+
+    def __getattr__(self, name):
+        if self.queryset is None:
+            raise AttributeError(name)
+        return getattr(self.queryset, name)
+
 #===============================================================================
 # TranslationAware
 #===============================================================================
@@ -851,17 +1656,10 @@ class TranslationAwareQueryset(QuerySet):
             language_joins must be a set that will be updated with required
             language joins for given key
         '''
-        newkey = []
-        for term in query_terms(model, key):
-            if term.translated:
-                newkey.append('%s__%s' % (term.model._meta.translations_accessor, term.term))
-            else:
-                newkey.append(term.term)
-            if term.target is not None:
-                taccessor = getattr(term.target._meta, 'translations_accessor', None)
-                if taccessor is not None:
-                    language_joins.add('__'.join(newkey + [taccessor, 'language_code']))
-        return '__'.join(newkey)
+        newkey, joins = get_lookup_cache(model).get('translation_aware', key,
+                                                    resolve_translation_aware)
+        language_joins.update(joins)
+        return newkey
 
     def _translate_args_kwargs(self, *args, **kwargs):
         self.language(self._language_code)
@@ -871,11 +1669,8 @@ class TranslationAwareQueryset(QuerySet):
             (self._translate(key, self.model, language_joins), value)
             for key, value in kwargs.items()
         )
-        newargs = deepcopy(args)
-        for q in newargs:
-            for child, children, index in q_children(q):
-                children[index] = (self._translate(child[0], self.model, language_joins),
-                                   child[1])
+        translate = lambda key: self._translate(key, self.model, language_joins)
+        newargs = tuple(map_q(q, translate) for q in args)
         for langjoin in language_joins:
             extra_filters &= Q(**{langjoin: self._language_code})
         return newargs, newkwargs, extra_filters
@@ -1018,6 +1813,9 @@ class TranslationAwareManager(models.Manager):
 
 class TranslationsModelManager(models.Manager):
     def get_language(self, language):
+        instance = getattr(self, 'instance', None)
+        if instance is not None:
+            return get_translation(instance, language)
         qs = self.all()
         if qs._result_cache is None:
             return self.get(language_code=language)
@@ -3,14 +3,14 @@ from django.core import checks
 from django.core.exceptions import ImproperlyConfigured
 from django.db import models
 from django.db.models.base import ModelBase
-from django.db.models.fields import FieldDoesNotExist
 from django.db.models.manager import Manager
 from django.db.models.signals import class_prepared
 from django.utils.translation import get_language
 from hvad.descriptors import LanguageCodeAttribute, TranslatedAttribute
 from hvad.manager import TranslationManager, TranslationsModelManager
 from hvad.settings import hvad_settings
-from hvad.utils import (get_cached_translation, set_cached_translation,
+from hvad.utils import (get_best_translation, get_cached_translation, get_cached_translations,
+                        get_cached_languages, set_cached_languages, set_cached_translation,
                         SmartGetFieldByName, SmartGetField)
 from hvad.compat import MethodType
 from itertools import chain
@@ -172,9 +172,20 @@ class TranslatedFields(object):
 
         model._meta.translations_accessor = related_name
         model._meta.translations_cache = '%s_cache' % related_name
+        model._meta.translations_map = '%s_map' % related_name
+        model._meta.translations_languages = '%s_languages' % related_name
+
+        # Field routing tables, telling shared and translated names apart
+        # without probing get_field(). Shared names are added once model is prepared.
+        ignore_fields = frozenset(('pk', 'master', 'master_id', translations_model._meta.pk.name))
+        translated_fields = translations_model._meta.fields + translations_model._meta.many_to_many
+        model._meta.veto_field_names = ignore_fields
+        model._meta.translated_field_names = frozenset(
+            field.name for field in translated_fields) - ignore_fields
+        model._meta.translated_attnames = frozenset(
+            field.attname for field in translated_fields) - ignore_fields
 
         # Set descriptors
-        ignore_fields = ('pk', 'master', 'master_id', translations_model._meta.pk.name)
         for field in translations_model._meta.fields:
             if field.name in ignore_fields:
                 continue
@@ -190,6 +201,27 @@ class TranslatedFields(object):
 #===============================================================================
 
 class BaseTranslationModel(models.Model):
+    def _get_cached_master(self):
+        ''' Shared instance this translation belongs to, if loaded '''
+        return self.__dict__.get(self._meta.get_field('master').get_cache_name())
+
+    def save(self, *args, **kwargs):
+        super(BaseTranslationModel, self).save(*args, **kwargs)
+        master = self._get_cached_master()
+        languages = None if master is None else get_cached_languages(master)
+        if languages is not None and self.language_code not in languages:
+            languages.append(self.language_code)
+    save.alters_data = True
+
+    def delete(self, *args, **kwargs):
+        result = super(BaseTranslationModel, self).delete(*args, **kwargs)
+        master = self._get_cached_master()
+        languages = None if master is None else get_cached_languages(master)
+        if languages is not None and self.language_code in languages:
+            languages.remove(self.language_code)
+        return result
+    delete.alters_data = True
+
     def _get_unique_checks(self, exclude=None):
         # Due to the way translations are handled, checking for unicity of
         # the ('language_code', 'master') constraint is useless. We filter it out
@@ -221,27 +253,20 @@ class TranslatableModel(models.Model):
 
     def __init__(self, *args, **kwargs):
         # Split arguments into shared/translatd
-        veto_names = ('pk', 'master', 'master_id', self._meta.translations_model._meta.pk.name)
+        opts = self._meta
         skwargs, tkwargs = {}, {}
-        translations_opts = self._meta.translations_model._meta
         for key, value in kwargs.items():
-            if key in veto_names:
-                skwargs[key] = value
+            if key in opts.translated_field_names or key in opts.translated_attnames:
+                tkwargs[key] = value
             else:
-                try:
-                    translations_opts.get_field(key)
-                except FieldDoesNotExist:
-                    skwargs[key] = value
-                else:
-                    tkwargs[key] = value
+                skwargs[key] = value
         super(TranslatableModel, self).__init__(*args, **skwargs)
         if tkwargs:
             tkwargs['language_code'] = tkwargs.get('language_code') or get_language()
             set_cached_translation(self, self._meta.translations_model(**tkwargs))
 
     def save(self, *args, **skwargs):
-        veto_names = ('pk', 'master', 'master_id', self._meta.translations_model._meta.pk.name)
-        translations_opts = self._meta.translations_model._meta
+        opts = self._meta
         translation = get_cached_translation(self)
         tkwargs = skwargs.copy()
 
@@ -250,20 +275,21 @@ class TranslatableModel(models.Model):
         if update_fields is not None:
             supdate, tupdate = [], []
             for name in update_fields:
-                if name in veto_names:
-                    supdate.append(name)
+                if name in opts.translated_field_names or name in opts.translated_attnames:
+                    tupdate.append(name)
                 else:
-                    try:
-                        translations_opts.get_field(name)
-                    except FieldDoesNotExist:
-                        supdate.append(name)
-                    else:
-                        tupdate.append(name)
+                    supdate.append(name)
             skwargs['update_fields'], tkwargs['update_fields'] = supdate, tupdate
 
         # save share and translated model in a single transaction
         if update_fields is None or skwargs['update_fields']:
+            adding = self._state.adding
+            # An instance built with the pk of an existing row updates it
+            inserting = (self.pk is None or
+                         skwargs.get('force_insert', args[0] if args else False))
             super(TranslatableModel, self).save(*args, **skwargs)
+            if adding:
+                set_cached_languages(self, [] if inserting else None)
         if (update_fields is None or tkwargs['update_fields']) and translation is not None:
             if translation.pk is None and update_fields:
                 del tkwargs['update_fields'] # allow new translations
@@ -272,13 +298,14 @@ class TranslatableModel(models.Model):
     save.alters_data = True
 
     def translate(self, language_code):
-        ''' Create a new translation for current instance.
-            Does NOT check if the translation already exists!
+        ''' Switch to the translation in given language if the instance knows it,
+            or create a new translation for current instance.
+            Does NOT check if the translation already exists in the database!
         '''
-        set_cached_translation(
-            self,
-            self._meta.translations_model(language_code=language_code)
-        )
+        translation = get_cached_translations(self).get(language_code)
+        if translation is None:
+            translation = self._meta.translations_model(language_code=language_code)
+        set_cached_translation(self, translation)
         return self
     translate.alters_data = True
 
@@ -297,36 +324,37 @@ class TranslatableModel(models.Model):
         if stuff is not NoTranslation:
             return stuff
 
-        # get all translations
-        translations = getattr(self, self._meta.translations_accessor).all()
+        # current language, or any language in fallbacks, or an arbitrary translation
+        translation = get_best_translation(self, any_language=True)
 
         # if no translation exists, bail out now
-        if len(translations) == 0:
+        if translation is None:
             return default
 
-        # organize translations into a nice dict
-        translation_dict = dict((t.language_code, t) for t in translations)
-
-        # see if we have the right language, or any language in fallbacks
-        for code in (get_language(),) + hvad_settings.FALLBACK_LANGUAGES:
-            try:
-                translation = translation_dict[code]
-            except KeyError:
-                continue
-            break
-        else:
-            # none of the fallbacks was found, pick an arbitrary translation
-            translation = translation_dict.popitem()[1]
-
         set_cached_translation(self, translation)
         return getattr(translation, name, default)
 
     def get_available_languages(self):
-        """ Get a list of all available language_code in db. """
-        qs = getattr(self, self._meta.translations_accessor).all()
-        if qs._result_cache is not None:
-            return [obj.language_code for obj in qs]
-        return qs.values_list('language_code', flat=True)
+        """ Get a list of all available language_code in db.
+            The list is cached on the instance, and kept up to date when its
+            translations are saved or deleted.
+        """
+        languages = get_cached_languages(self)
+        if languages is None:
+            qs = getattr(self, self._meta.translations_accessor).all()
+            if qs._result_cache is not None:
+                return [obj.language_code for obj in qs]
+            if self.pk is None:
+                return []
+            languages = list(qs.values_list('language_code', flat=True))
+            set_cached_languages(self, languages)
+        return list(languages)
+
+    def delete(self, *args, **kwargs):
+        result = super(TranslatableModel, self).delete(*args, **kwargs)
+        set_cached_languages(self, None)
+        return result
+    delete.alters_data = True
 
     #===========================================================================
     # Validation
@@ -385,12 +413,8 @@ class TranslatableModel(models.Model):
     @classmethod
     def _check_local_fields(cls, fields, option):
         """ Remove fields we recognize as translated fields from tests """
-        to_check = []
-        for field in fields:
-            try:
-                cls._meta.translations_model._meta.get_field(field)
-            except FieldDoesNotExist:
-                to_check.append(field)
+        translated = cls._meta.translated_field_names | cls._meta.translated_attnames
+        to_check = [field for field in fields if field not in translated]
         return super(TranslatableModel, cls)._check_local_fields(to_check, option)
 
     @classmethod
@@ -431,11 +455,27 @@ def prepare_translatable_model(sender, **kwargs):
         model._meta.translations_accessor = model._meta.concrete_model._meta.translations_accessor
         model._meta.translations_model = model._meta.concrete_model._meta.translations_model
         model._meta.translations_cache = model._meta.concrete_model._meta.translations_cache
+        model._meta.translations_map = model._meta.concrete_model._meta.translations_map
+        model._meta.translations_languages = model._meta.concrete_model._meta.translations_languages
+        model._meta.veto_field_names = model._meta.concrete_model._meta.veto_field_names
+        model._meta.translated_field_names = model._meta.concrete_model._meta.translated_field_names
+        model._meta.translated_attnames = model._meta.concrete_model._meta.translated_attnames
 
     if not hasattr(model._meta, 'translations_model'):
         raise ImproperlyConfigured("No TranslatedFields found on %r, subclasses of "
                                    "TranslatableModel must define TranslatedFields." % model)
 
+    # Complete field routing tables, now that all shared fields are known
+    shared_fields = model._meta.fields + model._meta.many_to_many
+    if django.VERSION >= (1, 10):
+        shared_fields += tuple(model._meta.private_fields)
+    else:
+        shared_fields += tuple(model._meta.virtual_fields)
+    model._meta.shared_field_names = frozenset(chain(
+        (field.name for field in shared_fields),
+        (getattr(field, 'attname', field.name) for field in shared_fields),
+    ))
+
     #### Now we have to work ####
 
     # Ensure _base_manager cannot be TranslationManager despite use_for_related_fields
@@ -1,8 +1,13 @@
 import django
-from django.db.models import Q, FieldDoesNotExist
+from django.db.models import Q, FieldDoesNotExist, DO_NOTHING, signals
+from django.db.models.deletion import get_candidate_relations_to_delete
 from django.db.models.expressions import Expression, Col
-from django.db.models.sql.where import AND
-from collections import namedtuple
+from django.db.models.sql import DeleteQuery, Query
+from django.db.models.sql.constants import CURSOR
+from django.db.models.sql.where import AND, WhereNode
+from collections import namedtuple, OrderedDict
+from copy import copy
+from threading import Lock
 
 __all__ = ()
 
@@ -103,6 +108,27 @@ def q_children(q):
             else:
                 yield child, q.children, index
 
+def map_q(q, func):
+    ''' Returns a version of a Q object where each key was replaced with
+        func(key). Only nodes that change are copied, others are shared with
+        the original Q object, which is left untouched.
+    '''
+    children = []
+    changed = False
+    for child in q.children:
+        if isinstance(child, Q):
+            newchild = map_q(child, func)
+        else:
+            key = func(child[0])
+            newchild = child if key == child[0] else (key, child[1])
+        changed = changed or newchild is not child
+        children.append(newchild)
+    if not changed:
+        return q
+    clone = copy(q)
+    clone.children = children
+    return clone
+
 def expression_nodes(expression):
     ''' Recursively visit an expression object, yielding each node in turn.
         - expression: the expression object to visit
@@ -115,6 +141,106 @@ def expression_nodes(expression):
         if isinstance(expression, Expression):
             todo.extend(expression.get_source_expressions())
 
+def map_expression(expression, func):
+    ''' Returns a copy of an expression object where each node was replaced with
+        the result of func(node). Nodes func returns as is are visited recursively.
+    '''
+    result = func(expression)
+    if result is expression and isinstance(expression, Expression):
+        result = expression.copy()
+        result.set_source_expressions([map_expression(node, func)
+                                       for node in expression.get_source_expressions()])
+    return result
+
+def where_columns(node):
+    ''' Lists the columns a where tree puts constraints on.
+        - node: the WhereNode to visit
+        - Returns a list of Col objects, or None if the tree has anything but
+          lookups comparing a column to plain values, such as subqueries,
+          expressions or transforms.
+    '''
+    columns = []
+    todo = [node]
+    while todo:
+        node = todo.pop()
+        for child in node.children:
+            if isinstance(child, WhereNode):
+                todo.append(child)
+                continue
+            lhs, rhs = getattr(child, 'lhs', None), getattr(child, 'rhs', None)
+            if not isinstance(lhs, Col):
+                return None
+            values = rhs if isinstance(rhs, (list, tuple, set, frozenset)) else (rhs,)
+            if any(hasattr(value, 'resolve_expression') or hasattr(value, 'get_compiler')
+                   for value in values):
+                return None
+            columns.append(lhs)
+    return columns
+
+def map_where_columns(node, func):
+    ''' Returns a copy of a where tree, where the column of each lookup was
+        replaced with the result of func(column). The tree must only have
+        lookups comparing a column to plain values, see where_columns.
+    '''
+    clone = copy(node)
+    clone.children = []
+    for child in node.children:
+        if isinstance(child, WhereNode):
+            clone.children.append(map_where_columns(child, func))
+        else:
+            child = copy(child)
+            child.lhs = func(child.lhs)
+            clone.children.append(child)
+    return clone
+
+#===============================================================================
+# Lookup path caching
+
+class LookupCache(object):
+    ''' Caches lookup paths on a model, resolved by builder functions, so all
+        querysets on the model share them. Thread-safe, holds up to size entries,
+        forgetting the oldest ones first.
+    '''
+    size = 1024
+
+    def __init__(self, model):
+        self.model = model
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __reduce__(self):
+        # Pickled querysets get the cache of the model on unpickling
+        return (get_lookup_cache, (self.model,))
+
+    def get(self, kind, path, builder):
+        ''' Returns the entry of given kind for path, calling
+            builder(model, path) to resolve it if not cached yet.
+        '''
+        key = (kind, path)
+        try:
+            return self._entries[key]
+        except KeyError:
+            pass
+        value = builder(self.model, path)
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def get_lookup_cache(model):
+    ''' Returns the LookupCache of given model, creating it on first use '''
+    opts = model._meta
+    try:
+        return opts.__dict__['lookup_cache']
+    except KeyError:
+        return opts.__dict__.setdefault('lookup_cache', LookupCache(model))
+
 #===============================================================================
 # Query manipulations
 
@@ -129,3 +255,197 @@ def add_alias_constraints(queryset, alias, **kwargs):
             value
         ), AND)
     queryset.query.where.add(clause, AND)
+
+class CorrelatedColumn(Expression):
+    """ Selects a field of the row of another table that relates to the current
+        row of the query, using a correlated subquery. This allows UPDATE queries
+        to reference a field of another table.
+        - field: the field to select, on its model's table.
+        - key: the field of the same table that must match outer_key.
+        - outer_key: the field of the query's base table.
+        - restrictions: (field, value) pairs further filtering the subquery.
+    """
+    contains_aggregate = False
+
+    def __init__(self, field, key, outer_key, restrictions=()):
+        super(CorrelatedColumn, self).__init__(output_field=field)
+        self.target = field
+        self.key = key
+        self.outer_key = outer_key
+        self.restrictions = tuple(restrictions)
+        self.alias = None
+
+    def resolve_expression(self, query=None, allow_joins=True, reuse=None,
+                           summarize=False, for_save=False):
+        clone = self.copy()
+        clone.alias = query.get_initial_alias()
+        return clone
+
+    def select_sql(self, column, connection):
+        return column
+
+    def as_sql(self, compiler, connection):
+        qn = connection.ops.quote_name
+        sql = ['(SELECT %s FROM %s hvad_correlated '
+               'WHERE hvad_correlated.%s = %s.%s' % (
+            self.select_sql('hvad_correlated.%s' % qn(self.target.column), connection),
+            qn(self.target.model._meta.db_table),
+            qn(self.key.column), compiler.quote_name_unless_alias(self.alias),
+            qn(self.outer_key.column),
+        )]
+        params = []
+        for field, value in self.restrictions:
+            sql.append('AND hvad_correlated.%s = %%s' % qn(field.column))
+            params.append(field.get_db_prep_value(value, connection))
+        return ' '.join(sql) + ')', params
+
+class AvailableLanguages(CorrelatedColumn):
+    """ Selects the sorted list of languages an object is translated in, using
+        a correlated subquery aggregating language codes of its translations.
+        - model: the translations model.
+        - outer_key: the field of the query's base table holding the object's pk.
+    """
+    def __init__(self, model, outer_key):
+        opts = model._meta
+        super(AvailableLanguages, self).__init__(opts.get_field('language_code'),
+                                                 opts.get_field('master'), outer_key)
+
+    def select_sql(self, column, connection):
+        if connection.vendor == 'postgresql':
+            return 'ARRAY_AGG(%s)' % column
+        if connection.vendor == 'mysql':
+            return "GROUP_CONCAT(%s SEPARATOR ',')" % column
+        if connection.vendor == 'oracle':
+            return "LISTAGG(%s, ',') WITHIN GROUP (ORDER BY %s)" % (column, column)
+        return "GROUP_CONCAT(%s, ',')" % column
+
+    def convert_value(self, value, expression, connection, context):
+        if not value:
+            return []
+        if not isinstance(value, (list, tuple)):
+            value = value.split(',')
+        return sorted(value)
+
+def window_functions_supported(connection):
+    """ Tells whether given connection supports ROW_NUMBER() OVER (...) """
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 25, 0)
+    if connection.vendor == 'mysql':
+        return connection.mysql_version >= (8, 0)
+    return True
+
+
+#===============================================================================
+# Raw deletions
+
+def can_fast_delete(model, ignore=()):
+    """ Tells whether instances of model can be deleted without the collector,
+        that is without sending signals nor cascading.
+        - ignore: models whose relations to model will be handled by caller.
+    """
+    opts = model._meta
+    if (signals.pre_delete.has_listeners(model) or
+            signals.post_delete.has_listeners(model) or
+            signals.m2m_changed.has_listeners(model)):
+        return False
+    if opts.concrete_model._meta.parents:
+        return False
+    for related in get_candidate_relations_to_delete(opts):
+        if related.related_model in ignore:
+            continue
+        rel = related.field.remote_field if django.VERSION >= (1, 9) else related.field.rel
+        if rel.on_delete is not DO_NOTHING:
+            return False
+    private_fields = opts.private_fields if django.VERSION >= (1, 10) else opts.virtual_fields
+    return not any(hasattr(field, 'bulk_related_objects') for field in private_fields)
+
+def raw_delete(model, using, **filters):
+    """ Deletes rows of model matching filters in a single DELETE statement.
+        Returns the number of deleted rows.
+    """
+    query = DeleteQuery(model)
+    query.add_q(Q(**filters))
+    cursor = query.get_compiler(using).execute_sql(CURSOR)
+    return cursor.rowcount if cursor else 0
+
+#===============================================================================
+# Native upserts
+
+def upsert_supported(connection):
+    """ Tells whether upsert() can run on given connection. It requires
+        INSERT ... ON CONFLICT and RETURNING support.
+    """
+    if connection.vendor == 'postgresql':
+        return connection.pg_version >= 90500
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35, 0)
+    return False
+
+def upsert(connection, obj, conflict, update):
+    """ Inserts obj, or updates fields listed in update on the row that
+        conflicts with it on fields listed in conflict.
+        - conflict must match a unique constraint of the table.
+        - obj is refreshed with the resulting row.
+        - Returns True if the row was created, False if it existed.
+    """
+    opts = obj._meta.concrete_model._meta
+    qn = connection.ops.quote_name
+    fields = opts.concrete_fields
+    insert_fields = [field for field in fields
+                     if not (field.primary_key and getattr(obj, field.attname) is None)]
+    values = dict((field.name, field.get_db_prep_save(field.pre_save(obj, True), connection))
+                  for field in insert_fields)
+    if update:
+        update = list(update) + [field.name for field in fields
+                                 if getattr(field, 'auto_now', False) and field.name not in update]
+    conflict_fields = [opts.get_field(name) for name in conflict]
+    update_fields = [opts.get_field(name) for name in update]
+
+    insert_sql = 'INSERT INTO %s (%s) VALUES (%s) ON CONFLICT (%s)' % (
+        qn(opts.db_table),
+        ', '.join(qn(field.column) for field in insert_fields),
+        ', '.join(['%s'] * len(insert_fields)),
+        ', '.join(qn(field.column) for field in conflict_fields),
+    )
+    insert_params = [values[field.name] for field in insert_fields]
+    returning = ', '.join(qn(field.column) for field in fields)
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # xmax is only zero on rows that were just inserted
+            cursor.execute('%s DO UPDATE SET %s RETURNING %s, (xmax = 0)' % (
+                insert_sql,
+                ', '.join('%s = EXCLUDED.%s' % (qn(field.column), qn(field.column))
+                          for field in (update_fields or conflict_fields)),
+                returning,
+            ), insert_params)
+            row = cursor.fetchone()
+            row, created = row[:-1], row[-1]
+        else:
+            cursor.execute('%s DO NOTHING RETURNING %s' % (insert_sql, returning),
+                           insert_params)
+            row = cursor.fetchone()
+            created = row is not None
+            if not created:
+                where = ' AND '.join('%s = %%s' % qn(field.column) for field in conflict_fields)
+                where_params = [values[field.name] for field in conflict_fields]
+                if update_fields:
+                    cursor.execute('UPDATE %s SET %s WHERE %s RETURNING %s' % (
+                        qn(opts.db_table),
+                        ', '.join('%s = %%s' % qn(field.column) for field in update_fields),
+                        where, returning,
+                    ), [values[field.name] for field in update_fields] + where_params)
+                else:
+                    cursor.execute('SELECT %s FROM %s WHERE %s' % (
+                        returning, qn(opts.db_table), where,
+                    ), where_params)
+                row = cursor.fetchone()
+
+    compiler = Query(opts.model).get_compiler(connection=connection)
+    columns = [field.get_col(opts.db_table) for field in fields]
+    row = compiler.apply_converters(row, compiler.get_converters(columns))
+    for field, value in zip(fields, row):
+        setattr(obj, field.attname, value)
+    obj._state.adding = False
+    obj._state.db = connection.alias
+    return created
@@ -14,6 +14,7 @@ _default_settings = {
     'TABLE_NAME_FORMAT': '%s_translation',
     'AUTOLOAD_TRANSLATIONS': True,
     'USE_DEFAULT_QUERYSET': False,
+    'FALLBACK_STRATEGIES': {},      # vendor => strategy, 'join' if missing
 }
 
 #===============================================================================
@@ -78,6 +79,31 @@ class HvadSettingsChecks:
                                          obj='USE_DEFAULT_QUERYSET', id='hvad.settings.W03'))
         return errors
 
+    @staticmethod
+    def check_FALLBACK_STRATEGIES(value):
+        from hvad.fallbacks import STRATEGIES, FallbackStrategy
+        errors = []
+        if (not isinstance(value, dict) or
+            not all(isinstance(item, FallbackStrategy) or item in STRATEGIES
+                    for item in value.values())):
+            errors.append(checks.Error('HVAD["FALLBACK_STRATEGIES"] must be a dict mapping '
+                                       'database vendors to fallback strategies',
+                                       hint='Available strategies: %s' % ', '.join(sorted(STRATEGIES)),
+                                       obj='FALLBACK_STRATEGIES', id='hvad.settings.E05'))
+            return errors
+        for vendor, item in sorted(value.items()):
+            strategy = item if isinstance(item, FallbackStrategy) else STRATEGIES[item]
+            if not strategy.matches_join:
+                errors.append(checks.Error(
+                    'HVAD["FALLBACK_STRATEGIES"] sets %r strategy as default for %r, '
+                    'but it returns different results than the join strategy' % (strategy.name, vendor),
+                    hint='Pass strategy=%r to fallbacks() where its results are acceptable. '
+                         'Strategies usable as defaults: %s' % (
+                         strategy.name, ', '.join(sorted(name for name, candidate in STRATEGIES.items()
+                                                         if candidate.matches_join))),
+                    obj='FALLBACK_STRATEGIES', id='hvad.settings.E06'))
+        return errors
+
 
 @checks.register(checks.Tags.models)
 def check(app_configs, **kwargs):
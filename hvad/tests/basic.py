@@ -5,6 +5,7 @@ from django.apps import apps
 from django.core import checks
 from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
 from django.db import connection, models, IntegrityError
+from django.db.models import signals
 from django.db.models.manager import Manager
 from django.db.models.query_utils import Q
 from django.utils import translation
@@ -12,11 +13,13 @@ from hvad import settings
 from hvad.exceptions import WrongManager
 from hvad.manager import TranslationQueryset
 from hvad.models import TranslatableModel, TranslatedFields
+from hvad.query import upsert_supported
 from hvad.utils import get_cached_translation
 from hvad.test_utils.data import NORMAL
 from hvad.test_utils.fixtures import NormalFixture
 from hvad.test_utils.testcase import HvadTestCase
-from hvad.test_utils.project.app.models import Normal, Unique, Related, MultipleFields, Boolean, Standard
+from hvad.test_utils.project.app.models import (Normal, Unique, Related, RelatedProxy,
+                                                MultipleFields, Boolean, Standard, AutoPopulated)
 from copy import deepcopy
 
 
@@ -84,6 +87,22 @@ class SettingsTests(HvadTestCase):
             with self.settings(HVAD={key: 'foo'}):
                 self.assertIn(error, settings.check(apps))
 
+    def test_fallback_strategies(self):
+        with self.settings(HVAD={'FALLBACK_STRATEGIES': {'sqlite': 'subquery',
+                                                         'postgresql': 'join'}}):
+            self.assertFalse(settings.check(apps))
+
+        for value in ({'sqlite': 'unknown'}, 'window'):
+            with self.settings(HVAD={'FALLBACK_STRATEGIES': value}):
+                self.assertEqual([error.id for error in settings.check(apps)],
+                                 ['hvad.settings.E05'])
+
+        # Strategies returning different results than join are rejected
+        with self.settings(HVAD={'FALLBACK_STRATEGIES': {'sqlite': 'window',
+                                                         'postgresql': 'python'}}):
+            self.assertEqual([error.id for error in settings.check(apps)],
+                             ['hvad.settings.E06', 'hvad.settings.E06'])
+
     def test_unknown_setting(self):
         error = checks.Warning('Unknown setting HVAD[\'UNKNOWN\']', obj='UNKNOWN',
                                id='hvad.settings.W01')
@@ -310,6 +329,21 @@ class OptionsTest(HvadTestCase):
         self.assertIs(Normal._meta.get_field(Normal._meta.translations_accessor).field.model,
                       Normal._meta.translations_model)
 
+    def test_field_routing(self):
+        opts = Related._meta
+        self.assertEqual(opts.veto_field_names, frozenset(('pk', 'id', 'master', 'master_id')))
+        self.assertEqual(opts.translated_field_names,
+                         frozenset(('translated', 'translated_to_translated', 'language_code')))
+        self.assertEqual(opts.translated_attnames,
+                         frozenset(('translated_id', 'translated_to_translated_id', 'language_code')))
+        self.assertEqual(opts.shared_field_names, frozenset(('id', 'normal', 'normal_id')))
+        for name in ('veto_field_names', 'translated_field_names', 'translated_attnames',
+                     'shared_field_names'):
+            self.assertEqual(getattr(RelatedProxy._meta, name), getattr(opts, name))
+
+        obj = Related(normal_id=None, translated_id=None, language_code='ja')
+        self.assertEqual(get_cached_translation(obj).language_code, 'ja')
+
 
 class QuerysetTest(HvadTestCase):
     def test_deepcopy(self):
@@ -329,6 +363,10 @@ class QuerysetTest(HvadTestCase):
         self.assertEqual(qs._language_fallbacks, None)
         qs = qs.fallbacks('en', 'fr')
         self.assertEqual(qs._language_fallbacks, ('en', 'fr'))
+        self.assertEqual(qs._fallbacks_strategy, None)
+        qs = qs.fallbacks('en', 'fr', strategy='window')
+        self.assertEqual(qs._language_fallbacks, ('en', 'fr'))
+        self.assertEqual(qs._fallbacks_strategy, 'window')
 
 
 class CreateTest(HvadTestCase):
@@ -449,6 +487,114 @@ class CreateTest(HvadTestCase):
             )
 
 
+class BulkCreateTest(HvadTestCase):
+    def test_bulk_create(self):
+        objs = [Normal(language_code='en', shared_field='shared%d' % i,
+                       translated_field='English%d' % i) for i in range(5)]
+        result = Normal.objects.language('en').bulk_create(objs, batch_size=2)
+        self.assertEqual(result, objs)
+        for i, obj in enumerate(objs):
+            self.assertIsNotNone(obj.pk)
+            self.assertSavedObject(obj, 'en', shared_field='shared%d' % i,
+                                   translated_field='English%d' % i)
+
+        # Returned objects can be saved
+        for obj in objs:
+            translation = get_cached_translation(obj)
+            self.assertIsNotNone(translation.pk)
+            self.assertFalse(translation._state.adding)
+            obj.translated_field = 'x-' + obj.translated_field
+            obj.save()
+        for i, obj in enumerate(objs):
+            self.assertSavedObject(obj, 'en', translated_field='x-English%d' % i)
+
+    def test_bulk_create_queries(self):
+        objs = [Normal(language_code='en', shared_field='shared%d' % i,
+                       translated_field='English%d' % i) for i in range(4)]
+        if getattr(connection.features, 'can_return_ids_from_bulk_insert', False):
+            expected = 2 + 2    # 2 shared batches, 2 translation batches
+        else:
+            expected = 4 + 2 + 2    # 4 shared inserts, 2 translation batches, 2 pk loads
+        with self.assertNumQueries(expected):
+            Normal.objects.language('en').bulk_create(objs, batch_size=2)
+
+    def test_bulk_create_multiple_languages(self):
+        obj = Normal(language_code='en', shared_field='shared', translated_field='English')
+        obj._prefetched_objects_cache = {'translations': [
+            Normal._meta.translations_model(language_code='ja', translated_field=u'日本語'),
+            Normal._meta.translations_model(language_code='en', translated_field='ignored'),
+        ]}
+        Normal.objects.language('en').bulk_create([obj])
+        self.assertCountEqual(
+            Normal.objects.language('all').filter(pk=obj.pk)
+                                          .values_list('language_code', 'translated_field'),
+            [('en', 'English'), ('ja', u'日本語')]
+        )
+
+    def test_bulk_create_untranslated(self):
+        obj = Normal(shared_field='shared')
+        Normal.objects.language('en').bulk_create([obj])
+        self.assertTrue(Normal.objects.untranslated().filter(pk=obj.pk).exists())
+        self.assertFalse(Normal.objects.language('all').filter(pk=obj.pk).exists())
+
+    def test_bulk_create_errors(self):
+        self.assertEqual(Normal.objects.language('en').bulk_create([]), [])
+        with self.assertRaises(TypeError):
+            Normal.objects.language('en').bulk_create([Standard()])
+        with self.assertRaises(ValueError):
+            Normal.objects.language('en').bulk_create([Normal(language_code='all')])
+        self.assertFalse(Normal.objects.untranslated().exists())
+
+
+class BulkUpdateTest(HvadTestCase, NormalFixture):
+    normal_count = 2
+
+    def test_bulk_update(self):
+        objs = list(Normal.objects.language('en').order_by('pk'))
+        for index, obj in enumerate(objs):
+            obj.shared_field = 'shared%d' % index
+            obj.translated_field = 'English%d' % index
+        with self.assertNumQueries(2):
+            count = Normal.objects.language('en').bulk_update(
+                objs, ['shared_field', 'translated_field'])
+        self.assertEqual(count, 2)
+        for index, obj in enumerate(objs):
+            self.assertSavedObject(obj, 'en', shared_field='shared%d' % index,
+                                   translated_field='English%d' % index)
+        self.assertEqual(Normal.objects.language('ja').get(pk=objs[0].pk).translated_field,
+                         NORMAL[1].translated_field['ja'])
+
+    def test_bulk_update_batch_size(self):
+        objs = list(Normal.objects.language('ja').order_by('pk'))
+        for obj in objs:
+            obj.translated_field = 'updated'
+        with self.assertNumQueries(2):
+            count = Normal.objects.language('en').bulk_update(objs, ['translated_field'],
+                                                               batch_size=1)
+        self.assertEqual(count, 2)
+        self.assertCountEqual(Normal.objects.language('ja')
+                                            .values_list('translated_field', flat=True),
+                              ['updated', 'updated'])
+        self.assertCountEqual(Normal.objects.language('en')
+                                            .values_list('translated_field', flat=True),
+                              [NORMAL[1].translated_field['en'], NORMAL[2].translated_field['en']])
+
+    def test_bulk_update_errors(self):
+        obj = Normal.objects.language('en').get(pk=self.normal_id[1])
+        qs = Normal.objects.language('en')
+        with self.assertRaises(ValueError):
+            qs.bulk_update([obj], [])
+        with self.assertRaises(ValueError):
+            qs.bulk_update([obj], ['language_code'])
+        with self.assertRaises(FieldDoesNotExist):
+            qs.bulk_update([obj], ['nonexistent'])
+        with self.assertRaises(ValueError):
+            qs.bulk_update([Normal(shared_field='shared')], ['shared_field'])
+        untranslated = Normal.objects.untranslated().get(pk=self.normal_id[1])
+        with self.assertRaises(ValueError):
+            qs.bulk_update([untranslated], ['translated_field'])
+
+
 class UpdateTest(HvadTestCase, NormalFixture):
     normal_count = 2
 
@@ -660,6 +806,105 @@ class DeleteLanguageCodeTest(HvadTestCase, NormalFixture):
         self.assertRaises(AttributeError, delattr, en, 'language_code')
 
 
+class AvailableLanguagesTests(HvadTestCase, NormalFixture):
+    normal_count = 2
+
+    def test_cached(self):
+        obj = Normal.objects.untranslated().get(pk=self.normal_id[1])
+        with self.assertNumQueries(1):
+            self.assertCountEqual(obj.get_available_languages(), ['en', 'ja'])
+        with self.assertNumQueries(0):
+            self.assertCountEqual(obj.get_available_languages(), ['en', 'ja'])
+
+        # Translations saved or deleted through the instance update the cache
+        obj.translate('de')
+        obj.translated_field = 'Deutsch'
+        obj.save()
+        with self.assertNumQueries(0):
+            self.assertCountEqual(obj.get_available_languages(), ['en', 'ja', 'de'])
+        obj.translations.get_language('ja').delete()
+        with self.assertNumQueries(0):
+            self.assertCountEqual(obj.get_available_languages(), ['en', 'de'])
+
+        # New objects start with the translation they are created with
+        with translation.override('en'):
+            obj = Normal.objects.language('ja').create(shared_field='shared', translated_field='Japanese')
+        with self.assertNumQueries(0):
+            self.assertEqual(obj.get_available_languages(), ['ja'])
+        with self.assertNumQueries(0):
+            self.assertEqual(Normal().get_available_languages(), [])
+
+        # Instances built with the pk of an existing row do not start empty
+        obj = Normal(pk=self.normal_id[1], language_code='fr',
+                     shared_field=NORMAL[1].shared_field, translated_field='French')
+        obj.save()
+        with self.assertNumQueries(1):
+            self.assertCountEqual(obj.get_available_languages(), ['en', 'de', 'fr'])
+
+        obj.delete()
+        self.assertIsNone(getattr(obj, obj._meta.translations_languages, None))
+
+    def test_primed_by_language_all(self):
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.language('all').filter(shared_field=NORMAL[1].shared_field))
+        with self.assertNumQueries(0):
+            for obj in objs:
+                self.assertCountEqual(obj.get_available_languages(), ['en', 'ja'])
+
+        # Filters on translated fields only match some translations
+        with self.assertNumQueries(1):
+            obj, = Normal.objects.language('all').filter(translated_field=NORMAL[1].translated_field['en'])
+        with self.assertNumQueries(1):
+            self.assertCountEqual(obj.get_available_languages(), ['en', 'ja'])
+
+        # So does slicing
+        obj = Normal.objects.language('all').order_by('pk', 'language_code')[0]
+        with self.assertNumQueries(1):
+            self.assertCountEqual(obj.get_available_languages(), ['en', 'ja'])
+
+
+class AutoloadSiblingsTests(HvadTestCase, NormalFixture):
+    normal_count = 2
+
+    def test_autoload_siblings(self):
+        """ Autoloading a translation loads it for all instances of the queryset """
+        with self.settings(HVAD={'AUTOLOAD_TRANSLATIONS': True, 'FALLBACK_LANGUAGES': ()}):
+            objs = list(Normal.objects.untranslated().order_by('pk'))
+            with self.assertNumQueries(1), translation.override('ja'):
+                self.assertEqual([obj.translated_field for obj in objs],
+                                 [NORMAL[1].translated_field['ja'], NORMAL[2].translated_field['ja']])
+
+            # Default manager links instances as well
+            objs = list(Normal.objects.order_by('pk'))
+            objs[1].translate('en')
+            with self.assertNumQueries(1), translation.override('ja'):
+                self.assertEqual(objs[0].translated_field, NORMAL[1].translated_field['ja'])
+                self.assertEqual(objs[1].translated_field, '')
+
+            # Missing translations are looked up once
+            objs = list(Normal.objects.untranslated())
+            with self.assertNumQueries(1), translation.override('fr'):
+                for obj in objs:
+                    self.assertRaises(AttributeError, getattr, obj, 'translated_field')
+
+            # Streamed instances cannot be batched, so they are not linked
+            with self.assertNumQueries(3), translation.override('ja'):
+                for obj in Normal.objects.untranslated().order_by('pk').iterator():
+                    self.assertFalse(hasattr(obj, '_translation_siblings'))
+                    obj.translated_field
+
+        # Missing translations fall back on their own
+        with self.settings(HVAD={'AUTOLOAD_TRANSLATIONS': True, 'FALLBACK_LANGUAGES': ('ja',)}):
+            objs = list(Normal.objects.untranslated().order_by('pk'))
+            with self.assertNumQueries(3), translation.override('fr'):
+                self.assertEqual([obj.translated_field for obj in objs],
+                                 [NORMAL[1].translated_field['ja'], NORMAL[2].translated_field['ja']])
+
+        with self.settings(HVAD={'AUTOLOAD_TRANSLATIONS': False}):
+            obj = Normal.objects.untranslated().get(pk=self.normal_id[1])
+            self.assertFalse(hasattr(obj, '_translation_siblings'))
+
+
 class DescriptorTests(HvadTestCase, NormalFixture):
     normal_count = 1
 
@@ -694,9 +939,18 @@ class DescriptorTests(HvadTestCase, NormalFixture):
         # Get translated attribute without a translation loaded, AUTOLOAD is true but none exists
         obj = Normal.objects.untranslated().get(pk=self.normal_id[1])
         with self.assertNumQueries(1):
-            with self.settings(HVAD={'AUTOLOAD_TRANSLATIONS': True}), translation.override('fr'):
+            with self.settings(HVAD={'AUTOLOAD_TRANSLATIONS': True, 'FALLBACK_LANGUAGES': ()}), \
+                 translation.override('fr'):
                 self.assertRaises(AttributeError, getattr, obj, 'translated_field')
 
+        # Get translated attribute without a translation loaded, AUTOLOAD is true and a fallback exists
+        obj = Normal.objects.untranslated().get(pk=self.normal_id[1])
+        with self.assertNumQueries(1):
+            with self.settings(HVAD={'AUTOLOAD_TRANSLATIONS': True, 'FALLBACK_LANGUAGES': ('de', 'ja', 'en')}), \
+                 translation.override('fr'):
+                self.assertEqual(obj.translated_field, NORMAL[1].translated_field['ja'])
+                self.assertEqual(obj.language_code, 'ja')
+
     def test_translated_attribute_set(self):
         """ Translated attribute set behaviors """
 
@@ -729,6 +983,15 @@ class DescriptorTests(HvadTestCase, NormalFixture):
             with self.settings(HVAD={'AUTOLOAD_TRANSLATIONS': True}), translation.override('fr'):
                 self.assertRaises(AttributeError, setattr, obj, 'translated_field', 'foo')
 
+        # Set translated attribute without a translation loaded, fallbacks are not used
+        obj = Normal.objects.untranslated().get(pk=self.normal_id[1])
+        with self.settings(HVAD={'AUTOLOAD_TRANSLATIONS': True, 'FALLBACK_LANGUAGES': ('en',)}), \
+             translation.override('fr'):
+            self.assertRaises(AttributeError, setattr, obj, 'translated_field', 'foo')
+            self.assertIsNone(get_cached_translation(obj))
+        self.assertEqual(Normal.objects.language('en').get(pk=self.normal_id[1]).translated_field,
+                         NORMAL[1].translated_field['en'])
+
     def test_translated_attribute_delete(self):    
         """ Translated attribute delete behaviors """
 
@@ -996,6 +1259,108 @@ class GetOrCreateTest(HvadTestCase):
             )
 
 
+class UpdateOrCreateTest(HvadTestCase):
+    def test_create_by_pk(self):
+        en = Normal.objects.language('en').create(shared_field='shared',
+                                                  translated_field='English')
+        ja, created = Normal.objects.language('ja').update_or_create(
+            pk=en.pk, defaults={'translated_field': u'日本語'}
+        )
+        self.assertTrue(created)
+        self.assertEqual(ja.pk, en.pk)
+        self.assertEqual(ja.shared_field, 'shared')
+        self.assertSavedObject(ja, 'ja', translated_field=u'日本語')
+
+    def test_update_by_pk(self):
+        en = Normal.objects.language('en').create(shared_field='shared',
+                                                  translated_field='English')
+        if upsert_supported(connection):
+            # one upsert per table on PostgreSQL, sqlite needs an extra update
+            expected = 2 if connection.vendor == 'postgresql' else 4
+        else:
+            expected = 3
+            if connection.features.uses_savepoints:
+                expected += 2
+        with self.assertNumQueries(expected):
+            obj, created = Normal.objects.language('en').update_or_create(
+                pk=en.pk,
+                defaults={'shared_field': 'updated', 'translated_field': 'x-English'}
+            )
+        self.assertFalse(created)
+        self.assertEqual(obj.pk, en.pk)
+        self.assertSavedObject(obj, 'en', shared_field='updated',
+                               translated_field='x-English')
+
+    def test_update_by_unique(self):
+        obj, created = Unique.objects.language('en').update_or_create(
+            shared_field='shared',
+            defaults={'translated_field': 'English', 'unique_by_lang': 'one'}
+        )
+        self.assertTrue(created)
+        other, created = Unique.objects.language('en').update_or_create(
+            shared_field='shared',
+            defaults={'translated_field': 'x-English'}
+        )
+        self.assertFalse(created)
+        self.assertEqual(other.pk, obj.pk)
+        self.assertEqual(other.unique_by_lang, 'one')
+        self.assertSavedObject(other, 'en', shared_field='shared',
+                               translated_field='x-English', unique_by_lang='one')
+
+    def test_update_generic_lookup(self):
+        obj, created = Normal.objects.language('en').update_or_create(
+            shared_field='shared', defaults={'translated_field': 'English'}
+        )
+        self.assertTrue(created)
+        other, created = Normal.objects.language('en').update_or_create(
+            shared_field='shared', defaults={'translated_field': 'x-English'}
+        )
+        self.assertFalse(created)
+        self.assertEqual(other.pk, obj.pk)
+        self.assertSavedObject(other, 'en', shared_field='shared',
+                               translated_field='x-English')
+
+    def test_get_or_create_by_unique(self):
+        Unique.objects.language('en').create(shared_field='shared',
+                                             translated_field='English',
+                                             unique_by_lang='one')
+        # existing shared instance is not translated, just like other lookups
+        with self.assertRaises(IntegrityError):
+            Unique.objects.language('ja').get_or_create(
+                shared_field='shared',
+                defaults={'translated_field': u'日本語', 'unique_by_lang': 'one'}
+            )
+
+    def test_custom_save(self):
+        obj, created = AutoPopulated.objects.language('en').update_or_create(
+            pk=1, defaults={'translated_name': 'Some Name'}
+        )
+        self.assertTrue(created)
+        self.assertEqual(obj.slug, 'some-name')
+        self.assertSavedObject(obj, 'en', translated_name='Some Name', slug='some-name')
+
+    def test_signals(self):
+        sent = []
+        def receiver(sender, **kwargs):
+            sent.append(sender)
+        signals.post_save.connect(receiver, sender=Normal)
+        try:
+            obj, created = Normal.objects.language('en').update_or_create(
+                pk=1, defaults={'shared_field': 'shared', 'translated_field': 'English'}
+            )
+        finally:
+            signals.post_save.disconnect(receiver, sender=Normal)
+        self.assertTrue(created)
+        self.assertEqual(sent, [Normal])
+        self.assertSavedObject(obj, 'en', shared_field='shared', translated_field='English')
+
+    def test_update_or_create_invalid_lang(self):
+        with self.assertRaises(ValueError):
+            Normal.objects.language().update_or_create(pk=1, defaults={'language_code': 'all'})
+        with self.assertRaises(ValueError):
+            Normal.objects.language('en').update_or_create(pk=1, language_code='en')
+
+
 class BooleanTests(HvadTestCase):
     def test_boolean_on_shared(self):
         Boolean.objects.language('en').create(shared_flag=True, translated_flag=False)
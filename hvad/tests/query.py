@@ -1,11 +1,21 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db import connection
-from django.db.models import Count
+from django.db.models import Count, F, Value, signals
+from django.db.models.functions import Concat
 from django.db.models.query_utils import Q
+from django.test.utils import CaptureQueriesContext
 from django.utils import translation
-from hvad.utils import get_cached_translation
+from django.utils.six import StringIO
+from hvad.fallbacks import FallbackStrategy, STRATEGIES
+from hvad.query import LookupCache, get_lookup_cache
+from hvad.utils import (get_cached_translation, get_translation, load_translation,
+                        get_translation_aware_manager)
 from hvad.test_utils.data import NORMAL, STANDARD
 from hvad.test_utils.testcase import HvadTestCase
-from hvad.test_utils.project.app.models import Normal, AggregateModel, Standard, SimpleRelated
+from hvad.test_utils.project.app.models import (Normal, AggregateModel, Standard, SimpleRelated,
+                                               MultipleFields, Related, Unique)
 from hvad.test_utils.fixtures import NormalFixture, StandardFixture
 
 class FilterTests(HvadTestCase, NormalFixture):
@@ -87,6 +97,27 @@ class FilterTests(HvadTestCase, NormalFixture):
             self.assertEqual(obj2.translated_field, NORMAL[2].translated_field['en'])
 
 
+    def test_q_object_untouched(self):
+        translated = Q(translated_field=NORMAL[1].translated_field['en'], language_code='en')
+        q = Q(shared_field=NORMAL[1].shared_field) | translated
+        qs = Normal.objects.language('en').filter(q)
+        self.assertEqual([obj.pk for obj in qs], [self.normal_id[1]])
+        self.assertEqual(q.children[0], ('shared_field', NORMAL[1].shared_field))
+        self.assertIs(q.children[1], translated)
+
+        # Nodes that need no translation are shared
+        args, kwargs = Normal.objects.language('en')._translate_args_kwargs(translated, q)
+        self.assertIs(args[0], translated)
+        self.assertIsNot(args[1], q)
+        self.assertIs(args[1].children[1], translated)
+        self.assertEqual(args[1].children[0], ('master__shared_field', NORMAL[1].shared_field))
+
+    def test_clone_select_related(self):
+        qs = Normal.objects.language('en').select_related('simplerel')
+        clone = qs.filter(pk=self.normal_id[1]).select_related('rel1')
+        self.assertEqual(qs._raw_select_related, ('simplerel',))
+        self.assertEqual(clone._raw_select_related, ('simplerel', 'rel1'))
+
 class ExtraTests(HvadTestCase, NormalFixture):
     normal_count = 2
 
@@ -144,6 +175,430 @@ class QueryCachingTests(HvadTestCase, NormalFixture):
             self._try_all_cache_using_methods(qs, 1)
 
 
+class LookupCacheTests(HvadTestCase, NormalFixture):
+    normal_count = 1
+
+    def _fail(self, model, path):
+        self.fail('path %r was resolved again' % path)
+
+    def test_shared(self):
+        cache = get_lookup_cache(Normal)
+        self.assertIs(get_lookup_cache(Normal), cache)
+        self.assertIsNot(get_lookup_cache(Standard), cache)
+
+        with translation.override('en'):
+            self.assertEqual(Normal.objects.language().filter(shared_field='foo').count(), 0)
+            get_translation_aware_manager(Standard).language().filter(
+                normal__translated_field='foo').count()
+        self.assertEqual(cache.get('shared', 'shared_field', self._fail),
+                         'master__shared_field')
+        self.assertEqual(get_lookup_cache(Standard).get('translation_aware',
+                                                        'normal__translated_field', self._fail),
+                         ('normal__translations__translated_field',
+                          ('normal__translations__language_code',)))
+
+    def test_bounded(self):
+        cache = LookupCache(Normal)
+        cache.size = 2
+        for path in ('foo', 'bar', 'baz'):
+            self.assertEqual(cache.get('test', path, lambda model, path: path.upper()), path.upper())
+        self.assertEqual(cache.get('test', 'baz', self._fail), 'BAZ')
+        self.assertEqual(cache.get('test', 'foo', lambda model, path: 'resolved'), 'resolved')
+
+    def test_pickling(self):
+        import pickle
+        self.assertIs(pickle.loads(pickle.dumps(get_lookup_cache(Normal))),
+                      get_lookup_cache(Normal))
+
+
+class WindowFallbacksTests(HvadTestCase, NormalFixture):
+    normal_count = 2
+
+    def setUp(self):
+        super(WindowFallbacksTests, self).setUp()
+        (Normal.objects.language('en')
+                       .filter(shared_field=NORMAL[1].shared_field)
+                       .delete_translations())
+
+    def test_window_filter(self):
+        qs = Normal.objects.language('en').fallbacks('de', 'ja', strategy='window')
+        with self.assertNumQueries(2):
+            self.assertEqual(qs.count(), self.normal_count)
+            self.assertCountEqual(((obj.pk, obj.language_code, obj.translated_field)
+                                   for obj in qs),
+                                  ((self.normal_id[1], 'ja', NORMAL[1].translated_field['ja']),
+                                   (self.normal_id[2], 'en', NORMAL[2].translated_field['en'])))
+        qs = qs.filter(translated_field=NORMAL[1].translated_field['ja'])
+        self.assertEqual([obj.pk for obj in qs], [self.normal_id[1]])
+
+    def test_window_matches_join(self):
+        for languages in (('en', 'ja'), ('ja', 'en'), ('de', 'ja', 'en'), ('en', 'en', 'ja')):
+            join = Normal.objects.language(languages[0]).fallbacks(*languages[1:])
+            window = (Normal.objects.language(languages[0])
+                                    .fallbacks(*languages[1:], strategy='window'))
+            self.assertCountEqual(((obj.pk, obj.language_code) for obj in window),
+                                  ((obj.pk, obj.language_code) for obj in join))
+
+    def test_window_restricts_languages(self):
+        # unlike the join, the window strategy ignores languages not requested
+        qs = Normal.objects.language('en').fallbacks('de', strategy='window')
+        self.assertEqual([obj.pk for obj in qs], [self.normal_id[2]])
+
+    def test_window_update_delete(self):
+        qs = Normal.objects.language('en').fallbacks('ja', strategy='window')
+        qs.filter(shared_field=NORMAL[1].shared_field).update(shared_field='updated')
+        self.assertEqual(Normal.objects.language('ja').get(shared_field='updated').pk,
+                         self.normal_id[1])
+        qs.filter(shared_field='updated').delete()
+        self.assertEqual(Normal.objects.untranslated().count(), self.normal_count - 1)
+
+    def test_strategy_arguments(self):
+        qs = Normal.objects.language('en')
+        with self.assertRaises(ValueError):
+            qs.fallbacks('ja', strategy='unknown')
+        with self.assertRaises(TypeError):
+            qs.fallbacks('ja', unknown='window')
+
+
+class FallbacksCountTests(HvadTestCase, NormalFixture):
+    normal_count = 2
+
+    def setUp(self):
+        super(FallbacksCountTests, self).setUp()
+        (Normal.objects.language('en')
+                       .filter(shared_field=NORMAL[1].shared_field)
+                       .delete_translations())
+        self.normal_id[3] = Normal.objects.language('de').create(shared_field='Shared3').pk
+
+    def assertCountMatches(self, qs, ranked):
+        with self.assertNumQueries(2) as ctx:
+            self.assertEqual(qs.count(), len(list(qs._clone())))
+        self.assertEqual(qs.exists(), qs.count() > 0)
+        self.assertEqual('CASE' in ctx.captured_queries[0]['sql'], ranked)
+
+    def test_count_shared_filters(self):
+        for strategy in (None, 'window'):
+            qs = Normal.objects.language('en').fallbacks('ja', strategy=strategy)
+            self.assertCountMatches(qs, False)
+            self.assertCountMatches(qs.filter(shared_field__in=(NORMAL[1].shared_field,
+                                                                NORMAL[2].shared_field)), False)
+            self.assertCountMatches(qs.filter(pk=self.normal_id[3]), False)
+            self.assertCountMatches(qs.exclude(shared_field=NORMAL[2].shared_field), False)
+            self.assertCountMatches(qs.filter(shared_field='missing'), False)
+
+    def test_count_restricted_languages(self):
+        qs = Normal.objects.language('en').fallbacks('ja', strategy='window')
+        self.assertEqual(qs.count(), 2)
+        qs = Normal.objects.language('en').fallbacks('ja')
+        self.assertEqual(qs.count(), 3)
+
+    def test_count_translated_filters(self):
+        qs = Normal.objects.language('en').fallbacks('ja')
+        self.assertCountMatches(qs.filter(translated_field=NORMAL[1].translated_field['ja']), True)
+        self.assertCountMatches(qs.filter(language_code='ja'), True)
+        self.assertCountMatches(qs.filter(Q(shared_field=NORMAL[2].shared_field) |
+                                          Q(translated_field=NORMAL[1].translated_field['ja'])),
+                                True)
+
+    def test_count_sliced(self):
+        qs = Normal.objects.language('en').fallbacks('ja')[:2]
+        self.assertEqual(qs.count(), 2)
+
+
+class FallbackStrategyTests(HvadTestCase, NormalFixture):
+    normal_count = 2
+
+    def setUp(self):
+        super(FallbackStrategyTests, self).setUp()
+        (Normal.objects.language('en')
+                       .filter(shared_field=NORMAL[1].shared_field)
+                       .delete_translations())
+        self.normal_id[3] = Normal.objects.language('de').create(shared_field='Shared3').pk
+
+    def get_results(self, strategy, *languages):
+        qs = (Normal.objects.language(languages[0])
+                            .fallbacks(*languages[1:], strategy=strategy)
+                            .order_by('pk'))
+        return [(obj.pk, obj.language_code) for obj in qs]
+
+    def test_strategies_agree(self):
+        for languages in (('en', 'ja'), ('ja', 'en'), ('fr', 'ja'), ('fr', 'es')):
+            join = self.get_results('join', *languages)
+            self.assertEqual(self.get_results('subquery', *languages), join)
+            window = self.get_results('window', *languages)
+            self.assertEqual(self.get_results('python', *languages), window)
+            self.assertEqual([item for item in join if item in window], window)
+
+    def test_unrequested_languages_picks_one(self):
+        for strategy in ('join', 'subquery'):
+            self.assertEqual(len(self.get_results(strategy, 'fr', 'es')), 3)
+
+    def test_python_strategy(self):
+        qs = Normal.objects.language('en').fallbacks('ja', strategy='python')
+        with self.assertNumQueries(1):
+            self.assertCountEqual([(obj.pk, obj.language_code, obj.translated_field) for obj in qs],
+                                  [(self.normal_id[1], 'ja', NORMAL[1].translated_field['ja']),
+                                   (self.normal_id[2], 'en', NORMAL[2].translated_field['en'])])
+        qs = qs.filter(translated_field=NORMAL[2].translated_field['ja'])
+        self.assertEqual(qs.count(), 1)
+        self.assertEqual([(obj.pk, obj.language_code) for obj in qs],
+                         [(self.normal_id[2], 'ja')])
+
+    def test_python_strategy_slicing(self):
+        qs = (Normal.objects.language('de').fallbacks('en', 'ja', strategy='python')
+                            .order_by('-shared_field'))
+        self.assertEqual([obj.pk for obj in qs[1:]], [self.normal_id[2], self.normal_id[1]])
+        self.assertEqual([obj.pk for obj in qs[:2]], [self.normal_id[3], self.normal_id[2]])
+        self.assertEqual(qs[2].pk, self.normal_id[1])
+        self.assertEqual(qs.first().pk, self.normal_id[3])
+
+        # Objects are sliced in SQL, and only their candidates are loaded
+        with self.assertNumQueries(1 if connection.features.allow_sliced_subqueries else 2):
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual([(obj.pk, obj.language_code) for obj in qs[1:2]],
+                                 [(self.normal_id[2], 'en')])
+        self.assertIn('LIMIT 1', ctx.captured_queries[0]['sql'])
+
+    def test_python_strategy_unsupported(self):
+        qs = Normal.objects.language('en').fallbacks('ja', strategy='python')
+        with self.assertRaises(NotImplementedError):
+            list(qs.order_by('translated_field'))
+        with self.assertRaises(NotImplementedError):
+            list(qs.values('pk'))
+        with self.assertRaises(NotImplementedError):
+            qs.update(translated_field='foo')
+
+    def test_default_strategy(self):
+        with self.settings(HVAD={'FALLBACK_STRATEGIES': {connection.vendor: 'subquery'}}):
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.get_results(None, 'fr', 'ja'), self.get_results('join', 'fr', 'ja'))
+            self.assertIn('LIMIT 1', ctx.captured_queries[0]['sql'])
+
+        # Strategies returning different results cannot be defaults
+        for name in ('python', 'window'):
+            with self.settings(HVAD={'FALLBACK_STRATEGIES': {connection.vendor: name}}):
+                with self.assertRaises(ImproperlyConfigured):
+                    self.get_results(None, 'de', 'ja')
+
+    def test_custom_strategy(self):
+        class FirstLanguageStrategy(FallbackStrategy):
+            name = 'first_language'
+            def apply(self, queryset, languages):
+                queryset.query.add_filter(('language_code', languages[0]))
+
+        self.assertEqual(self.get_results(FirstLanguageStrategy(), 'ja', 'en'),
+                         [(self.normal_id[1], 'ja'), (self.normal_id[2], 'ja')])
+
+    def test_benchmark_command(self):
+        output = StringIO()
+        call_command('benchmark_fallbacks', 'app.Normal', languages='en,ja',
+                     repeat=1, stdout=output)
+        output = output.getvalue()
+        self.assertIn('app.Normal', output)
+        for name, strategy in STRATEGIES.items():
+            if strategy.supports(connection):
+                self.assertIn(name, output)
+        self.assertIn('Recommended strategy for %s' % connection.vendor, output)
+        self.assertIn('(*) Returns different results', output)
+        recommended = output.split('Recommended strategy for %s: ' % connection.vendor)[1].split()[0]
+        self.assertTrue(STRATEGIES[recommended].matches_join)
+
+        with self.assertRaises(CommandError):
+            call_command('benchmark_fallbacks', 'app.Standard', stdout=StringIO())
+
+
+class FieldFallbacksTests(HvadTestCase):
+    def setUp(self):
+        super(FieldFallbacksTests, self).setUp()
+        obj = MultipleFields.objects.language('fr').create(
+            first_translated_field='fr first', second_translated_field='')
+        obj.translate('de')
+        obj.first_translated_field = 'de first'
+        obj.second_translated_field = 'de second'
+        obj.save()
+        obj.translate('en')
+        obj.first_translated_field = ''
+        obj.second_translated_field = 'en second'
+        obj.save()
+        self.obj_id = obj.pk
+
+    def test_per_field(self):
+        for strategy in STRATEGIES:
+            with self.assertNumQueries(1):
+                obj = (MultipleFields.objects.language('en')
+                                     .fallbacks('fr', 'de', strategy=strategy, per_field=True)
+                                     .get(pk=self.obj_id))
+            self.assertEqual(obj.language_code, 'en')
+            self.assertEqual(obj.first_translated_field, 'fr first')
+            self.assertEqual(obj.second_translated_field, 'en second')
+            self.assertFalse(hasattr(obj, 'hvad_fallback_first_translated_field'))
+
+    def test_per_field_missing_language(self):
+        obj = (MultipleFields.objects.language('ja')
+                             .fallbacks('fr', 'de', per_field=True)
+                             .get(pk=self.obj_id))
+        self.assertEqual(obj.language_code, 'fr')
+        self.assertEqual(obj.first_translated_field, 'fr first')
+        self.assertEqual(obj.second_translated_field, 'de second')
+
+    def test_per_field_all_empty(self):
+        obj = (MultipleFields.objects.language('fr')
+                             .fallbacks('es', per_field=True)
+                             .get(pk=self.obj_id))
+        self.assertEqual(obj.second_translated_field, '')
+
+    def test_per_field_disabled(self):
+        qs = MultipleFields.objects.language('en').fallbacks('fr', 'de')
+        self.assertEqual(qs.get(pk=self.obj_id).first_translated_field, '')
+        qs = qs.fallbacks('fr', 'de', per_field=True)
+        self.assertEqual(qs.count(), 1)
+        self.assertEqual(list(qs.values_list('first_translated_field', flat=True)), [''])
+
+
+class AnnotateAvailableLanguagesTests(HvadTestCase, NormalFixture):
+    normal_count = 2
+
+    def test_untranslated(self):
+        Normal.objects.language('ja').filter(pk=self.normal_id[2]).delete_translations()
+        Normal.objects.untranslated().create(shared_field='untranslated')
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.annotate_available_languages().order_by('pk'))
+            self.assertEqual([obj.get_available_languages() for obj in objs],
+                             [['en', 'ja'], ['en'], []])
+
+    def test_translated(self):
+        with self.assertNumQueries(1):
+            qs = Normal.objects.language('all').annotate_available_languages()
+            for obj in qs.filter(translated_field=NORMAL[1].translated_field['ja']):
+                self.assertEqual(obj.language_code, 'ja')
+                self.assertEqual(obj.get_available_languages(), ['en', 'ja'])
+
+        with self.assertNumQueries(1):
+            qs = Normal.objects.language('de').fallbacks('ja').annotate_available_languages()
+            self.assertEqual([obj.get_available_languages() for obj in qs],
+                             [['en', 'ja'], ['en', 'ja']])
+
+    def test_count(self):
+        qs = Normal.objects.language('de').fallbacks('ja', 'en').annotate_available_languages()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(qs.count(), self.normal_count)
+            self.assertTrue(qs.exists())
+        for query in ctx.captured_queries:
+            self.assertNotIn('language_code', query['sql'])
+
+
+class PrefetchStrategyTests(HvadTestCase, NormalFixture):
+    normal_count = 2
+
+    def test_prefetch(self):
+        with CaptureQueriesContext(connection) as ctx:
+            qs = Normal.objects.language('ja').strategy('prefetch')
+            objs = list(qs.filter(shared_field__in=[NORMAL[1].shared_field,
+                                                    NORMAL[2].shared_field])
+                          .order_by('-shared_field'))
+            self.assertEqual([obj.pk for obj in objs], [self.normal_id[2], self.normal_id[1]])
+            for index, obj in zip((2, 1), objs):
+                self.assertEqual(obj.language_code, 'ja')
+                self.assertEqual(obj.translated_field, NORMAL[index].translated_field['ja'])
+        self.assertEqual(len(ctx.captured_queries), 2)
+        shared_sql = ctx.captured_queries[0]['sql']
+        self.assertNotIn(Normal._meta.translations_model._meta.db_table,
+                         shared_sql.split('IN (SELECT')[0])
+
+    def test_slicing(self):
+        with self.assertNumQueries(2):
+            qs = Normal.objects.language('en').strategy('prefetch').order_by('pk')
+            objs = list(qs[1:])
+            self.assertEqual([obj.pk for obj in objs], [self.normal_id[2]])
+            self.assertEqual(objs[0].translated_field, NORMAL[2].translated_field['en'])
+
+    def test_fallbacks(self):
+        Normal.objects.language('ja').filter(pk=self.normal_id[1]).delete_translations()
+        Normal.objects.untranslated().create(shared_field='untranslated')
+        with self.assertNumQueries(2):
+            qs = Normal.objects.language('ja').fallbacks('en').strategy('prefetch')
+            objs = list(qs.order_by('pk'))
+            self.assertEqual([(obj.pk, obj.language_code) for obj in objs],
+                             [(self.normal_id[1], 'en'), (self.normal_id[2], 'ja')])
+
+    def test_fallbacks_other_languages(self):
+        """ Objects missing requested languages are kept, like with the join strategy """
+        obj = Normal.objects.language('de').create(shared_field='german', translated_field='Deutsch')
+        for strategy in ('join', 'prefetch'):
+            qs = Normal.objects.language('ja').fallbacks('fr').strategy(strategy).order_by('pk')
+            self.assertEqual(qs.count(), 3)
+            self.assertEqual([(item.pk, item.language_code) for item in qs],
+                             [(self.normal_id[1], 'ja'), (self.normal_id[2], 'ja'), (obj.pk, 'de')])
+            self.assertTrue(qs.filter(pk=obj.pk).exists())
+
+        # Strategies that restrict languages are honored
+        qs = Normal.objects.language('ja').fallbacks('fr', strategy='python').strategy('prefetch')
+        self.assertEqual(qs.count(), 2)
+        self.assertEqual(len(qs), 2)
+
+    def test_translated_filter(self):
+        with self.assertNumQueries(1):
+            qs = Normal.objects.language('en').strategy('prefetch')
+            objs = list(qs.filter(translated_field=NORMAL[1].translated_field['en']))
+            self.assertEqual([obj.pk for obj in objs], [self.normal_id[1]])
+
+    def test_join(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(len(Normal.objects.language('en').strategy('join')), self.normal_count)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, Normal.objects.language('en').strategy, 'invalid')
+
+
+class LanguagesTests(HvadTestCase, NormalFixture):
+    normal_count = 2
+
+    def test_languages(self):
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.languages('ja', 'en').order_by('pk'))
+            self.assertEqual([obj.pk for obj in objs], [self.normal_id[1], self.normal_id[2]])
+            for index, obj in enumerate(objs, 1):
+                self.assertEqual(obj.language_code, 'ja')
+                self.assertEqual(obj.translated_field, NORMAL[index].translated_field['ja'])
+                self.assertCountEqual([(trans.language_code, trans.translated_field)
+                                       for trans in obj.translations.all()],
+                                      [(lang, NORMAL[index].translated_field[lang])
+                                       for lang in ('en', 'ja')])
+                self.assertEqual(get_translation(obj, 'en').translated_field,
+                                 NORMAL[index].translated_field['en'])
+                self.assertEqual(load_translation(obj, 'en', enforce=True).translated_field,
+                                 NORMAL[index].translated_field['en'])
+
+    def test_languages_missing_translation(self):
+        (Normal.objects.language('ja')
+                       .filter(pk=self.normal_id[2])
+                       .delete_translations())
+        with self.assertNumQueries(1):
+            obj = Normal.objects.languages('ja', 'en', 'de').get(pk=self.normal_id[2])
+            self.assertEqual(obj.language_code, 'en')
+            self.assertEqual([trans.language_code for trans in obj.translations.all()], ['en'])
+            with self.assertRaises(Normal._meta.translations_model.DoesNotExist):
+                get_translation(obj, 'ja')
+
+    def test_languages_single(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(Normal.objects.languages('en').count(), self.normal_count)
+            obj = Normal.objects.languages('en').filter(pk=self.normal_id[1])[0]
+            self.assertEqual([trans.language_code for trans in obj.translations.all()], ['en'])
+
+    def test_languages_slicing(self):
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.languages('en', 'ja').order_by('-pk')[:1])
+            self.assertEqual([obj.pk for obj in objs], [self.normal_id[2]])
+            self.assertEqual(len(objs[0].translations.all()), 2)
+
+    def test_languages_errors(self):
+        with self.assertRaises(ValueError):
+            Normal.objects.languages()
+        with self.assertRaises(ValueError):
+            Normal.objects.languages('en', 'all')
+
+
 class IterTests(HvadTestCase, NormalFixture):
     normal_count = 2
 
@@ -197,6 +652,60 @@ class UpdateTests(HvadTestCase, NormalFixture):
         self.assertEqual(newja1.translated_field, ja1.translated_field)
         self.assertEqual(newja2.translated_field, ja2.translated_field)
 
+    def test_update_shared_selects_masters(self):
+        if not connection.features.update_can_self_select:
+            self.skipTest('backend loads primary keys before updating')
+        with CaptureQueriesContext(connection) as ctx:
+            (Normal.objects.language('en')
+                           .filter(translated_field=NORMAL[1].translated_field['en'])
+                           .update(shared_field='new shared'))
+        self.assertEqual(len(ctx.captured_queries), 1)
+        sql = ctx.captured_queries[0]['sql']
+        self.assertIn('master_id', sql)
+        self.assertNotIn('JOIN', sql)
+        self.assertEqual(Normal.objects.language('ja').get(pk=self.normal_id[1]).shared_field,
+                         'new shared')
+        self.assertEqual(Normal.objects.language('ja').get(pk=self.normal_id[2]).shared_field,
+                         NORMAL[2].shared_field)
+
+    def test_update_translated_from_shared(self):
+        with self.assertNumQueries(1):
+            count = (Normal.objects.language('en')
+                                   .filter(pk=self.normal_id[1])
+                                   .update(translated_field=Concat(F('shared_field'), Value('-'),
+                                                                   F('translated_field'))))
+        self.assertEqual(count, 1)
+        self.assertEqual(Normal.objects.language('en').get(pk=self.normal_id[1]).translated_field,
+                         '%s-%s' % (NORMAL[1].shared_field, NORMAL[1].translated_field['en']))
+        self.assertEqual(Normal.objects.language('ja').get(pk=self.normal_id[1]).translated_field,
+                         NORMAL[1].translated_field['ja'])
+        self.assertEqual(Normal.objects.language('en').get(pk=self.normal_id[2]).translated_field,
+                         NORMAL[2].translated_field['en'])
+
+    def test_update_shared_from_translated(self):
+        Normal.objects.language('ja').update(shared_field=F('translated_field'))
+        for index in (1, 2):
+            self.assertEqual(Normal.objects.language('en').get(pk=self.normal_id[index]).shared_field,
+                             NORMAL[index].translated_field['ja'])
+        with self.assertRaises(ValueError):
+            Normal.objects.language('all').update(shared_field=F('translated_field'))
+
+    def test_update_shared_from_translated_fallbacks(self):
+        Normal.objects.language('en').filter(pk=self.normal_id[1]).delete_translations()
+        # Would violate NOT NULL for objects only matched through fallbacks
+        with self.assertRaises(ValueError):
+            Normal.objects.language('en').fallbacks('ja').update(shared_field=F('translated_field'))
+        self.assertEqual(Normal.objects.language('ja').get(pk=self.normal_id[1]).shared_field,
+                         NORMAL[1].shared_field)
+
+    def test_update_shared_from_translated_fallbacks_nullable(self):
+        normal = Normal.objects.language('ja').get(pk=self.normal_id[1])
+        obj = Related.objects.language('ja').create(normal=normal, translated=normal)
+        # Would silently write NULL for objects only matched through fallbacks
+        with self.assertRaises(ValueError):
+            Related.objects.language('en').fallbacks('ja').update(normal=F('translated'))
+        self.assertEqual(Related.objects.language('ja').get(pk=obj.pk).normal_id, normal.pk)
+
     def test_update_translated(self):
         NEW_TRANSLATED = 'new translated'
         n1 = Normal.objects.language('en').get(pk=self.normal_id[1])
@@ -450,8 +959,43 @@ class InBulkTests(HvadTestCase, NormalFixture):
             self.assertEqual(result[pk2].language_code, 'ja')
 
     def test_all_languages_in_bulk(self):
+        pk1, pk2 = self.normal_id[1], self.normal_id[2]
+        with self.assertNumQueries(1):
+            result = Normal.objects.language('all').in_bulk([pk1, pk2])
+            self.assertCountEqual((pk1, pk2), result)
+        with self.assertNumQueries(0):
+            for index, pk in ((1, pk1), (2, pk2)):
+                self.assertCountEqual(result[pk], ('en', 'ja'))
+                for language, obj in result[pk].items():
+                    self.assertEqual(obj.pk, pk)
+                    self.assertEqual(obj.language_code, language)
+                    self.assertEqual(obj.translated_field,
+                                     NORMAL[index].translated_field[language])
+
+    def test_in_bulk_whole_queryset(self):
+        with self.assertNumQueries(1):
+            result = Normal.objects.language('en').in_bulk()
+            self.assertCountEqual(self.normal_id.values(), result)
+
+    def test_in_bulk_batch_size(self):
+        pk1, pk2 = self.normal_id[1], self.normal_id[2]
+        with self.assertNumQueries(2):
+            result = Normal.objects.language('en').in_bulk([pk1, pk2], batch_size=1)
+            self.assertCountEqual((pk1, pk2), result)
+        self.assertEqual(result[pk2].translated_field, NORMAL[2].translated_field['en'])
+
+    def test_in_bulk_field_name(self):
+        Unique.objects.language('en').create(shared_field='foo', translated_field='bar',
+                                             unique_by_lang='baz')
+        with self.assertNumQueries(1):
+            result = Unique.objects.language('en').in_bulk(['foo', 'nope'],
+                                                           field_name='shared_field')
+            self.assertCountEqual(('foo',), result)
+            self.assertEqual(result['foo'].translated_field, 'bar')
+
+    def test_in_bulk_non_unique_field_name(self):
         with self.assertRaises(ValueError):
-            Normal.objects.language('all').in_bulk([self.normal_id[1]])
+            Normal.objects.language('en').in_bulk(['foo'], field_name='shared_field')
 
     def test_in_bulk_deferred_language(self):
         pk1 = self.normal_id[1]
@@ -495,6 +1039,25 @@ class DeleteTests(HvadTestCase, NormalFixture):
         self.assertEqual(Normal.objects.untranslated().count(), 2)
         self.assertEqual(Normal._meta.translations_model.objects.count(), 2)
 
+    def test_batched_delete_translation(self):
+        Normal.objects.language('en').create(shared_field='shared3', translated_field='en3')
+        with CaptureQueriesContext(connection) as ctx:
+            Normal.objects.language('en').delete_translations(batch_size=2)
+        deletes = [query for query in ctx.captured_queries
+                   if 'DELETE FROM' in query['sql']]
+        self.assertEqual(len(deletes), 2)
+        self.assertEqual(Normal.objects.language('en').count(), 0)
+        self.assertEqual(Normal.objects.language('ja').count(), 2)
+        self.assertEqual(Normal.objects.untranslated().count(), 3)
+
+    def test_batched_delete_translation_commit_batches(self):
+        (Normal.objects.language('all')
+                       .filter(shared_field=NORMAL[1].shared_field)
+                       .delete_translations(batch_size=1, commit_batches=True))
+        self.assertEqual(Normal._meta.translations_model.objects.count(), 2)
+        self.assertEqual(Normal.objects.language('en').get().pk, self.normal_id[2])
+        self.assertEqual(Normal.objects.language('ja').get().pk, self.normal_id[2])
+
     def test_delete_translation_deferred_language(self):
         self.assertEqual(Normal._meta.translations_model.objects.count(), 4)
         with translation.override('ja'):
@@ -513,6 +1076,65 @@ class DeleteTests(HvadTestCase, NormalFixture):
         self.assertEqual(Normal.objects.language('en').count(), self.normal_count - 1)
 
 
+class FastDeleteTests(HvadTestCase):
+    def setUp(self):
+        super(FastDeleteTests, self).setUp()
+        for index in range(3):
+            obj = MultipleFields.objects.language('en').create(
+                first_shared_field='shared%d' % index, first_translated_field='en%d' % index)
+            obj.translate('ja')
+            obj.first_translated_field = 'ja%d' % index
+            obj.save()
+        self.translations_label = 'app.MultipleFieldsTranslation'
+
+    def test_fast_delete(self):
+        with self.assertNumQueries(3):
+            result = (MultipleFields.objects.language('ja')
+                                            .filter(first_translated_field='ja1')
+                                            .fast_delete())
+        self.assertEqual(result, (3, {'app.MultipleFields': 1, self.translations_label: 2}))
+        self.assertCountEqual(MultipleFields.objects.language('en')
+                                                    .values_list('first_translated_field', flat=True),
+                              ('en0', 'en2'))
+        self.assertEqual(MultipleFields._meta.translations_model.objects.count(), 4)
+
+    def test_fast_delete_batch_size(self):
+        # Primary keys are loaded one batch at a time, with LIMIT
+        with CaptureQueriesContext(connection) as ctx:
+            result = MultipleFields.objects.language('en').fast_delete(batch_size=2)
+        self.assertEqual(len(ctx.captured_queries), 6)
+        for query in (ctx.captured_queries[0], ctx.captured_queries[3]):
+            self.assertIn('LIMIT 2', query['sql'])
+        self.assertEqual(result, (9, {'app.MultipleFields': 3, self.translations_label: 6}))
+        self.assertEqual(MultipleFields._meta.translations_model.objects.count(), 0)
+
+    def test_fast_delete_sliced(self):
+        # Slices are resolved once, they would match other objects after a batch
+        qs = MultipleFields.objects.language('all').order_by('-first_shared_field')[:4]
+        result = qs.fast_delete(batch_size=1)
+        self.assertEqual(result, (6, {'app.MultipleFields': 2, self.translations_label: 4}))
+        self.assertEqual(list(MultipleFields.objects.untranslated()
+                                                   .values_list('first_shared_field', flat=True)),
+                         ['shared0'])
+
+    def test_delete_uses_fast_delete(self):
+        with self.assertNumQueries(3):
+            MultipleFields.objects.language('en').filter(first_shared_field='shared0').delete()
+        self.assertEqual(MultipleFields.objects.untranslated().count(), 2)
+
+    def test_delete_with_signals(self):
+        deleted = []
+        def receiver(sender, instance, **kwargs):
+            deleted.append(instance.pk)
+        signals.pre_delete.connect(receiver, sender=MultipleFields)
+        try:
+            MultipleFields.objects.language('en').filter(first_shared_field='shared0').delete()
+        finally:
+            signals.pre_delete.disconnect(receiver, sender=MultipleFields)
+        self.assertEqual(len(deleted), 1)
+        self.assertEqual(MultipleFields.objects.untranslated().count(), 2)
+
+
 class GetTranslationFromInstanceTests(HvadTestCase, NormalFixture):
     normal_count = 1
 
@@ -712,11 +1334,9 @@ class DeferOnlyTests(HvadTestCase, NormalFixture):
 class NotImplementedTests(HvadTestCase):
     def test_notimplemented(self):
         baseqs = SimpleRelated.objects.language('en')
-        
-        self.assertRaises(NotImplementedError, baseqs.bulk_create, [])
+
         # select_related with no field is not implemented
         self.assertRaises(NotImplementedError, baseqs.select_related)
-        self.assertRaises(NotImplementedError, baseqs.update_or_create)
 
 
 class ExcludeTests(HvadTestCase, NormalFixture):
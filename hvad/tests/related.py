@@ -5,6 +5,7 @@ from django.db.models.query_utils import Q
 from django.test.testcases import TransactionTestCase
 from django.utils import translation
 from hvad.exceptions import WrongManager
+from hvad.manager import TranslatedPrefetch
 from hvad.models import (TranslatedFields, TranslatableModel)
 from hvad.test_utils.data import NORMAL, STANDARD
 from hvad.test_utils.fixtures import NormalFixture, StandardFixture
@@ -12,7 +13,7 @@ from hvad.test_utils.testcase import HvadTestCase
 from hvad.utils import get_translation_aware_manager
 from hvad.test_utils.project.app.models import (Normal, Related, SimpleRelated,
                                                 RelatedRelated, Standard, StandardRelated,
-                                                Date)
+                                                Date, Many)
 
 
 class NormalToNormalFKTest(HvadTestCase, NormalFixture):
@@ -459,9 +460,40 @@ class SelectRelatedTests(HvadTestCase, NormalFixture):
         with self.assertRaises(FieldError):
             list(RelatedRelated.objects.language().select_related('simple__manynormals'))
 
-    def test_fallbacks_raise(self):
-        with self.assertRaises(NotImplementedError):
-            list(Related.objects.language().fallbacks().select_related('normal'))
+    def test_select_related_fallbacks(self):
+        with translation.override('ja'):
+            normal3 = Normal.objects.language().create(shared_field='shared3',
+                                                       translated_field='translated3_ja')
+            SimpleRelated.objects.language().create(normal=normal3, translated_field='test3')
+            SimpleRelated.objects.language().create(normal=self.normal2, translated_field='test2')
+
+        for strategy in (None, 'window'):
+            with self.assertNumQueries(1):
+                objs = (SimpleRelated.objects.language('en').fallbacks('ja', strategy=strategy)
+                                             .select_related('normal').order_by('normal__pk'))
+                self.assertEqual([(obj.language_code, obj.translated_field,
+                                   obj.normal.language_code, obj.normal.translated_field)
+                                  for obj in objs], [
+                    ('en', 'test1', 'en', NORMAL[1].translated_field['en']),
+                    ('ja', 'test2', 'en', NORMAL[2].translated_field['en']),
+                    ('ja', 'test3', 'ja', 'translated3_ja'),
+                ])
+
+    def test_select_related_fallbacks_null_relation(self):
+        with translation.override('en'):
+            related1 = Related.objects.language().create(normal=self.normal1, translated=None)
+            related2 = Related.objects.language('ja').create(normal=None, translated=self.normal2)
+
+        with self.assertNumQueries(1):
+            objs = (Related.objects.language('en').fallbacks('ja')
+                                   .select_related('normal', 'translated').order_by('pk'))
+            self.assertEqual([(obj.pk, obj.language_code,
+                               obj.normal and obj.normal.translated_field,
+                               obj.translated and obj.translated.translated_field)
+                              for obj in objs], [
+                (related1.pk, 'en', NORMAL[1].translated_field['en'], None),
+                (related2.pk, 'ja', None, NORMAL[2].translated_field['en']),
+            ])
 
     def test_select_related_semantics(self):
         qs = Related.objects.language()
@@ -536,6 +568,23 @@ class SelectRelatedTests(HvadTestCase, NormalFixture):
                     else:
                         self.fail("Invalid Related object; ID is %s" % r.id)
 
+    def test_select_related_streams(self):
+        with translation.override('en'):
+            SimpleRelated.objects.language().create(normal=self.normal2, translated_field="test2")
+        field = (getattr(Normal, Normal._meta.translations_accessor).rel.field
+                 if django.VERSION >= (1, 9) else
+                 getattr(Normal, Normal._meta.translations_accessor).related.field)
+
+        with self.assertNumQueries(1):
+            objects = (SimpleRelated.objects.language('en').select_related('normal')
+                                            .order_by('pk').iterator())
+            first = next(objects)
+            # fields are only forced unique until Django sets up the query
+            self.assertFalse(field.unique)
+            self.assertEqual(first.normal.translated_field, NORMAL[1].translated_field['en'])
+            self.assertEqual([obj.normal.translated_field for obj in objects],
+                             [NORMAL[2].translated_field['en']])
+
     def test_select_related_language_all(self):
         with translation.override('en'):
             obj = SimpleRelated.objects.language().create(normal=self.normal2, translated_field="test2_en")
@@ -687,3 +736,62 @@ class DeepSelectRelatedTests(HvadTestCase, StandardFixture, NormalFixture):
                 self.assertEqual(obj.simple.normal.pk, self.normal_id[1])
                 self.assertEqual(obj.simple.normal.translated_field,
                                  NORMAL[1].translated_field['en'])
+
+
+class TranslatedPrefetchTests(HvadTestCase, NormalFixture):
+    normal_count = 2
+
+    def setUp(self):
+        super(TranslatedPrefetchTests, self).setUp()
+        self.simplerel1 = SimpleRelated.objects.language('en').create(
+            normal_id=self.normal_id[1], translated_field='simplerel1_en')
+        self.simplerel1.translate('ja')
+        self.simplerel1.translated_field = 'simplerel1_ja'
+        self.simplerel1.save()
+        self.simplerel2 = SimpleRelated.objects.language('en').create(
+            normal_id=self.normal_id[1], translated_field='simplerel2_en')
+        self.many = Many.objects.create(name='many')
+        self.many.normals.add(self.normal_id[1], self.normal_id[2])
+
+    def test_reverse_foreign_key(self):
+        with self.assertNumQueries(2):
+            obj = (Normal.objects.untranslated()
+                                 .prefetch_related(TranslatedPrefetch('simplerel', language='ja'))
+                                 .get(pk=self.normal_id[1]))
+            self.assertEqual([(rel.pk, rel.translated_field) for rel in obj.simplerel.all()],
+                             [(self.simplerel1.pk, 'simplerel1_ja')])
+
+    def test_fallbacks(self):
+        with self.assertNumQueries(2):
+            obj = (Normal.objects.language('en')
+                                 .prefetch_related(TranslatedPrefetch('simplerel', language='ja',
+                                                                      fallbacks=('en',)))
+                                 .get(pk=self.normal_id[1]))
+            self.assertEqual(sorted((rel.pk, rel.language_code, rel.translated_field)
+                                    for rel in obj.simplerel.all()),
+                             [(self.simplerel1.pk, 'ja', 'simplerel1_ja'),
+                              (self.simplerel2.pk, 'en', 'simplerel2_en')])
+
+    def test_many_to_many(self):
+        with self.assertNumQueries(2):
+            obj = (Many.objects.prefetch_related(TranslatedPrefetch('normals', language='ja',
+                                                                    to_attr='ja_normals'))
+                               .get(pk=self.many.pk))
+            self.assertEqual(sorted((normal.pk, normal.translated_field)
+                                    for normal in obj.ja_normals),
+                             [(self.normal_id[1], NORMAL[1].translated_field['ja']),
+                              (self.normal_id[2], NORMAL[2].translated_field['ja'])])
+
+    def test_foreign_key(self):
+        with translation.override('ja'):
+            with self.assertNumQueries(2):
+                objs = list(SimpleRelated.objects.language('en')
+                                                 .prefetch_related(TranslatedPrefetch('normal'))
+                                                 .order_by('pk'))
+                for obj in objs:
+                    self.assertEqual(obj.normal.pk, self.normal_id[1])
+                    self.assertEqual(obj.normal.translated_field, NORMAL[1].translated_field['ja'])
+
+    def test_untranslatable(self):
+        qs = Normal.objects.untranslated().prefetch_related(TranslatedPrefetch('manyrels'))
+        self.assertRaises(TypeError, list, qs)
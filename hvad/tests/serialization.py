@@ -44,6 +44,17 @@ class PicklingTest(HvadTestCase):
         self.assertEqual(normal.language_code, unpickled.language_code)
         self.assertEqual(normal.translated_field, unpickled.translated_field)
 
+    def test_autoloading_object_can_be_pickled(self):
+        Normal.objects.create(shared_field="Shared")
+        with translation.override('en'):
+            normal = Normal.objects.create(shared_field="Shared", translated_field="English")
+        normal = Normal.objects.untranslated().order_by('pk')[1]
+        serialized_repr = pickle.dumps(normal)
+
+        unpickled = pickle.loads(serialized_repr)
+        with translation.override('en'):
+            self.assertEqual(unpickled.translated_field, "English")
+
     def test_queryset_can_be_pickled(self):
         normal = Normal.objects.create(
             shared_field="Shared",
@@ -1,5 +1,8 @@
-from hvad.utils import (get_cached_translation, set_cached_translation,
-                        combine, get_translation, load_translation)
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import translation
+from hvad.utils import (get_cached_translation, get_cached_translations, set_cached_translation,
+                        combine, get_translation, get_best_translation, load_translation)
 from hvad.test_utils.data import NORMAL
 from hvad.test_utils.fixtures import NormalFixture
 from hvad.test_utils.testcase import HvadTestCase
@@ -33,16 +36,40 @@ class TranslationAccessorTests(HvadTestCase, NormalFixture):
         with self.assertNumQueries(0):
             self.assertEqual(get_cached_translation(obj).language_code, 'en')
 
+    def test_get_cached_translations(self):
+        obj = Normal.objects.language('en').get(pk=self.normal_id[1])
+        with self.assertNumQueries(0):
+            self.assertEqual(list(get_cached_translations(obj)), ['en'])
+        with self.assertNumQueries(1):
+            ja = obj.translations.get_language('ja')
+        with self.assertNumQueries(0):
+            self.assertCountEqual(get_cached_translations(obj), ['en', 'ja'])
+            self.assertIs(obj.translations.get_language('ja'), ja)
+            self.assertIs(load_translation(obj, 'ja', enforce=True), ja)
+
+            en = get_cached_translation(obj)
+            obj.translated_field = 'changed'
+            obj.translate('ja')
+            self.assertIs(get_cached_translation(obj), ja)
+            self.assertEqual(obj.translated_field, NORMAL[1].translated_field['ja'])
+            obj.translate('en')
+            self.assertIs(get_cached_translation(obj), en)
+            self.assertEqual(obj.translated_field, 'changed')
+
+            obj.translate('sr')
+            self.assertIsNone(get_cached_translation(obj).pk)
+            self.assertCountEqual(get_cached_translations(obj), ['en', 'ja', 'sr'])
+
     def test_combine(self):
         model = Normal._meta.translations_model
         qs = model.objects.select_related('master').filter(master=self.normal_id[1])
 
-        for translation in qs:
-            combined = combine(translation, NormalProxy)
+        for trans in qs:
+            combined = combine(trans, NormalProxy)
             self.assertEqual(combined.pk, self.normal_id[1])
             self.assertEqual(combined.shared_field, NORMAL[1].shared_field)
             self.assertEqual(combined.translated_field,
-                             NORMAL[1].translated_field[translation.language_code])
+                             NORMAL[1].translated_field[trans.language_code])
             self.assertIsInstance(combined, NormalProxy)
 
     def test_get_translation(self):
@@ -53,13 +80,22 @@ class TranslationAccessorTests(HvadTestCase, NormalFixture):
             self.assertEqual(translation.language_code, 'ja')
             self.assertEqual(translation.translated_field, NORMAL[1].translated_field['ja'])
 
-        # translation loaded (it should be ignored)
+        # translation loaded (it should be used)
         obj = Normal.objects.language('en').get(pk=self.normal_id[1])
         obj.translated_field = 'changed'
-        with self.assertNumQueries(1):
+        with self.assertNumQueries(0):
             translation = get_translation(obj, 'en')
             self.assertEqual(translation.language_code, 'en')
-            self.assertEqual(translation.translated_field, NORMAL[1].translated_field['en'])
+            self.assertEqual(translation.translated_field, 'changed')
+
+        # translations loaded earlier are remembered
+        with self.assertNumQueries(1):
+            self.assertEqual(get_translation(obj, 'ja').translated_field,
+                             NORMAL[1].translated_field['ja'])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_translation(obj, 'ja').translated_field,
+                             NORMAL[1].translated_field['ja'])
+            self.assertIs(get_translation(obj, 'en'), translation)
 
         # with prefetching
         obj = Normal.objects.untranslated().prefetch_related('translations').get(pk=self.normal_id[1])
@@ -72,6 +108,44 @@ class TranslationAccessorTests(HvadTestCase, NormalFixture):
         with self.assertNumQueries(0):
             self.assertRaises(Normal.DoesNotExist, get_translation, obj, 'xx')
 
+    def test_get_best_translation(self):
+        # Single query, with LIMIT 1
+        obj = Normal.objects.untranslated().get(pk=self.normal_id[1])
+        with CaptureQueriesContext(connection) as ctx:
+            best = get_best_translation(obj, ('fr', 'ja', 'en'))
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn('LIMIT 1', ctx.captured_queries[0]['sql'])
+        self.assertEqual(best.language_code, 'ja')
+        self.assertIsNone(get_cached_translation(obj))
+
+        # Known translations are used, languages ranking below are not looked up
+        with self.assertNumQueries(0):
+            self.assertIs(get_best_translation(obj, ('ja', 'en')), best)
+        with self.assertNumQueries(1):
+            self.assertIs(get_best_translation(obj, ('fr', 'ja', 'en')), best)
+
+        # Missing translations
+        obj = Normal.objects.untranslated().get(pk=self.normal_id[1])
+        with self.assertNumQueries(1):
+            self.assertIsNone(get_best_translation(obj, ('fr', 'de')))
+        with self.assertNumQueries(1):
+            self.assertIn(get_best_translation(obj, ('fr', 'de'), any_language=True).language_code,
+                          ('en', 'ja'))
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_best_translation(Normal(), ('en',)))
+
+        # Defaults to current language and fallbacks
+        obj = Normal.objects.untranslated().get(pk=self.normal_id[1])
+        with self.settings(HVAD={'FALLBACK_LANGUAGES': ('en',)}), translation.override('fr'):
+            self.assertEqual(get_best_translation(obj).language_code, 'en')
+
+        # Prefetched translations are used
+        obj = Normal.objects.untranslated().prefetch_related('translations').get(pk=self.normal_id[1])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_best_translation(obj, ('fr', 'en', 'ja')).language_code, 'en')
+            self.assertIsNone(get_best_translation(obj, ('fr',)))
+            self.assertIsNotNone(get_best_translation(obj, ('fr',), any_language=True))
+
     def test_load_translation_normal(self):
         # no translation loaded, one exists in db for language
         obj = Normal.objects.untranslated().get(pk=self.normal_id[1])
@@ -1,7 +1,12 @@
 import django
+from django.db import connections
+from django.db.models import Case, IntegerField, Value, When
 from django.db.models.fields import FieldDoesNotExist
 from django.utils.translation import get_language
 from hvad.exceptions import WrongManager
+from hvad.settings import hvad_settings
+from collections import OrderedDict
+from weakref import ref
 
 __all__ = (
     'get_translation_aware_manager',
@@ -14,9 +19,22 @@ def get_cached_translation(instance):
     'Get currently cached translation of the instance'
     return getattr(instance, instance._meta.translations_cache, None)
 
+def get_cached_translations(instance):
+    ''' Get the dictionary of translations known to the instance, by language code.
+        It is created on first access, and can be updated in place.
+    '''
+    tmap = instance._meta.translations_map
+    try:
+        return getattr(instance, tmap)
+    except AttributeError:
+        translations = {}
+        setattr(instance, tmap, translations)
+        return translations
+
 def set_cached_translation(instance, translation):
     '''Sets the translation cached onto instance.
         - Passing None unsets the translation cache
+        - The translation is remembered in the instance's translations map
         - Returns the translation that was loaded before
     '''
     tcache = instance._meta.translations_cache
@@ -26,8 +44,27 @@ def set_cached_translation(instance, translation):
             delattr(instance, tcache)
     else:
         setattr(instance, tcache, translation)
+        if translation.language_code:
+            get_cached_translations(instance)[translation.language_code] = translation
     return previous
 
+def get_cached_languages(instance):
+    ''' Get the cached list of languages the instance is available in,
+        or None if it is not known.
+    '''
+    return getattr(instance, instance._meta.translations_languages, None)
+
+def set_cached_languages(instance, languages):
+    ''' Sets the cached list of languages the instance is available in.
+        - Passing None unsets it
+    '''
+    tlanguages = instance._meta.translations_languages
+    if languages is None:
+        if hasattr(instance, tlanguages):
+            delattr(instance, tlanguages)
+    else:
+        setattr(instance, tlanguages, languages)
+
 def combine(trans, klass):
     """
     'Combine' the shared and translated instances by setting the translation
@@ -39,25 +76,165 @@ def combine(trans, klass):
     combined = trans.master
     if klass._meta.proxy:
         combined.__class__ = klass
-    setattr(combined, combined._meta.translations_cache, trans)
+    set_cached_translation(combined, trans)
     return combined
 
 
-def get_translation(instance, language_code=None):
-    ''' Get translation by language. Fresh copy is loaded from DB.
-        Can leverage prefetched data, like in .prefetch_related('translations')
+def set_prefetched_translations(instance, translations):
+    ''' Fills the translations prefetch cache of instance, as
+        prefetch_related('translations') would, with given translations.
     '''
-    accessor = getattr(instance, instance._meta.translations_accessor)
+    accessor = instance._meta.translations_accessor
+    cache = instance.__dict__.setdefault('_prefetched_objects_cache', {})
+    cache.pop(accessor, None)
+    qs = getattr(instance, accessor).all()
+    qs._result_cache = list(translations)
+    qs._prefetch_done = True
+    cache[accessor] = qs
+    get_cached_translations(instance).update((translation.language_code, translation)
+                                             for translation in qs._result_cache)
 
+def get_translation(instance, language_code=None):
+    ''' Get translation by language. Translations known to the instance are
+        used first, then prefetched data, like in .prefetch_related('translations').
+        Otherwise, it is loaded from DB and remembered by the instance.
+    '''
     language_code = language_code or get_language()
+    translations = get_cached_translations(instance)
+    try:
+        return translations[language_code]
+    except KeyError:
+        pass
+
+    accessor = getattr(instance, instance._meta.translations_accessor)
     qs = accessor.all()
     if qs._result_cache is not None:
         # Take advantage of translation cache
         for obj in qs:
-            if obj.language_code == language_code:
-                return obj
-        raise accessor.model.DoesNotExist('%r is not translated in %r' % (instance, language_code))
-    return accessor.get(language_code=language_code)
+            translations.setdefault(obj.language_code, obj)
+        try:
+            return translations[language_code]
+        except KeyError:
+            raise accessor.model.DoesNotExist('%r is not translated in %r' % (instance, language_code))
+    translation = translations[language_code] = accessor.get(language_code=language_code)
+    return translation
+
+def get_best_translation(instance, languages=None, any_language=False):
+    ''' Get the first translation of instance in given languages, which default
+        to current language followed by FALLBACK_LANGUAGES. If none exists,
+        returns any translation if any_language is set, None otherwise.
+        Known translations and prefetched data are used when they are enough
+        to tell. Otherwise, the translation is loaded from DB using a single
+        query ranking candidates with LIMIT 1, and remembered by the instance.
+    '''
+    if languages is None:
+        languages = (get_language(),) + hvad_settings.FALLBACK_LANGUAGES
+    ranked = list(OrderedDict.fromkeys(code for code in languages if code))
+    translations = get_cached_translations(instance)
+
+    accessor = getattr(instance, instance._meta.translations_accessor)
+    qs = accessor.all()
+    prefetched = qs._result_cache is not None
+    if prefetched:
+        for obj in qs:
+            translations.setdefault(obj.language_code, obj)
+
+    # Only languages ranking before the best known one are worth a query
+    for index, code in enumerate(ranked):
+        if code in translations:
+            known = translations[code]
+            del ranked[index:]
+            break
+    else:
+        known = None
+
+    if known is not None and not ranked:
+        return known
+    if prefetched:
+        return next(iter(qs), None) if known is None and any_language else known
+    if instance.pk is None or not (ranked or any_language):
+        return known
+
+    if ranked:
+        rank = Case(*[When(language_code=code, then=Value(index))
+                      for index, code in enumerate(ranked)],
+                    default=Value(len(ranked)), output_field=IntegerField())
+        qs = accessor.order_by(rank.asc(), 'pk')
+        if known is not None or not any_language:
+            qs = qs.filter(language_code__in=ranked)
+    else:
+        qs = accessor.order_by('pk')
+    for translation in qs[:1]:
+        return translations.setdefault(translation.language_code, translation)
+    return known
+
+class TranslationSiblings(object):
+    ''' Instances loaded together from a queryset, held through weak references.
+        The first time a translation is autoloaded on one of them, translations
+        in the same language are loaded for all of them at once.
+    '''
+    attname = '_translation_siblings'
+
+    def __init__(self):
+        self.instances = []
+        self.loaded = {}    # language_code => number of instances already handled
+        self.missing = {}   # language_code => pks that have no such translation
+
+    def __reduce__(self):
+        # Siblings do not survive pickling, the unpickled instance is on its own
+        return (self.__class__, ())
+
+    def add(self, instance):
+        self.instances.append(ref(instance))
+        setattr(instance, self.attname, self)
+
+    def load(self, instance, language_code):
+        ''' Load translations in given language for all siblings that have no
+            translation loaded, nor known in that language.
+            Returns whether instance was part of the batch, in which case
+            its translation is known if it exists, and missing otherwise.
+        '''
+        missing = self.missing.setdefault(language_code, set())
+        if instance.pk in missing:
+            return True
+        start = self.loaded.get(language_code, 0)
+        self.loaded[language_code] = len(self.instances)
+        meta = instance._meta
+        pending = {}
+        for reference in self.instances[start:]:
+            obj = reference()
+            if (obj is None or obj.pk is None or hasattr(obj, meta.translations_cache) or
+                meta.translations_accessor in getattr(obj, '_prefetched_objects_cache', ()) or
+                language_code in get_cached_translations(obj)):
+                continue
+            pending.setdefault(obj.pk, obj)
+        if len(pending) < 2:
+            return False    # no need for batching
+        covered = pending.get(instance.pk) is instance
+
+        using = instance._state.db
+        pks = list(pending)
+        batch_size = max(connections[using].ops.bulk_batch_size(['master_id'], pks), 1)
+        manager = meta.translations_model._base_manager.db_manager(using)
+        for index in range(0, len(pks), batch_size):
+            qs = manager.filter(master_id__in=pks[index:index + batch_size],
+                                language_code=language_code)
+            for translation in qs:
+                obj = pending.pop(translation.master_id)
+                translation.master = obj
+                get_cached_translations(obj)[language_code] = translation
+        missing.update(pending)
+        return covered
+
+def load_sibling_translations(instance, language_code):
+    ''' Load translations in given language for instance and all instances
+        loaded along with it, if any. See TranslationSiblings.
+        Returns whether the translation of instance was looked up.
+    '''
+    siblings = getattr(instance, TranslationSiblings.attname, None)
+    if siblings is None or not language_code:
+        return False
+    return siblings.load(instance, language_code)
 
 def load_translation(instance, language, enforce=False):
     ''' Get or create a translation.